@@ -1,20 +1,89 @@
+import os
+import time
+_import_started = time.perf_counter()
+
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-from google_play_scraper import app, search, reviews, Sort
-try:
-    from google_play_scraper import suggestions
-except ImportError:
-    suggestions = None
-from textblob import TextBlob
-from wordcloud import WordCloud
-import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
-import re
-import io
-import nltk
-from nltk.util import ngrams
-from collections import Counter
+
+from scout.core import (SCREEN_DEFAULTS, analyze_competitor, compare_competitors, concat_market_frames, find_opportunities,
+                        get_market_decision, market_decisions, market_label, snapshot_metrics)
+from scout.fetch import ScanCache, fetch_competitors, fetch_detail, fetch_row_details, iter_market_data, sync_reviews
+from scout.lazy import import_budget_ms, import_report, record_import
+from scout import render
+from scout.export import FORMATS as EXPORT_FORMATS, export_bytes, export_frame
+from scout.metrics import METRICS
+from scout.reviews import COMPLAINT_CLUSTERS
+from scout.store import DetailCache, ReviewStore, SuggestionGraph, Watchlist, default_db_path
+from scout.watch import WatchWorker
+
+record_import("(startup) app.py", time.perf_counter() - _import_started)
+
+# Upper bound on reviews pulled per sync, so very busy apps stay interactive
+MAX_SYNC_REVIEWS = 10000
+# Upper bound on apps per bulk comparison
+MAX_COMPARE = 25
+
+# Display formatting for the typed market frame (the data itself stays numeric)
+MARKET_COLUMN_CONFIG = {
+    'Rating': st.column_config.NumberColumn(format="%.1f"),
+    'Instalasi': st.column_config.NumberColumn(format="localized"),
+    'Review': st.column_config.NumberColumn(format="localized"),
+    'Engagement': st.column_config.NumberColumn(format="%.1f"),
+    'Ukuran (MB)': st.column_config.NumberColumn(format="%.1f", help="0 = bervariasi per perangkat, kosong = detail belum diambil"),
+    'Update Terakhir': st.column_config.DateColumn(format="YYYY-MM-DD"),
+    'Link': st.column_config.LinkColumn(),
+    'Estimasi Omzet': st.column_config.NumberColumn(format="localized", help="Instalasi x harga, dalam 'Mata Uang'. 0 = gratis / iklan."),
+    'Detail': st.column_config.CheckboxColumn(help="Detail aplikasi sudah diambil (kosong = hanya data pencarian)."),
+}
+
+# Opportunity list sort options: label -> (column, ascending)
+OPPORTUNITY_SORTS = {
+    "Instalasi Terbanyak": ('Instalasi', False),
+    "Rating Terendah": ('Rating', True),
+    "Skor ASO Terendah": ('Skor ASO', True),
+    "Update Terlama": ('Update Terakhir', True),
+}
+
+
+def html_escape(series):
+    return (series.astype(str).str.replace("&", "&amp;").str.replace("<", "&lt;")
+            .str.replace(">", "&gt;").str.replace('"', "&quot;"))
+
+
+def opportunity_cards_html(opp):
+    """All opportunity cards of one page as a single HTML string, built column-wise."""
+    if opp.empty:
+        return ""
+    cards = (
+        '<div class="opportunity-card">'
+        '<div style="display:flex; justify-content:space-between; align-items:center;">'
+        '<h4 style="margin:0;"><span class="material-symbols-rounded" style="font-size:18px; vertical-align:middle;">target</span> '
+        + html_escape(opp['Judul']) + '</h4>'
+        '<span class="badge-tier">' + opp['Tier Kompetitor'].astype(str) + '</span></div>'
+        '<p style="margin-bottom:10px; font-size:0.8em; color:#777;"><i>' + html_escape(opp['App ID'])
+        + ' · ' + opp['Pasar'].astype(str) + '</i></p>'
+        '<p><b>Celah:</b> ' + opp['Tipe_Peluang'] + '</p>'
+        '<hr style="margin:8px 0; border-top:1px solid #eee;">'
+        '<div style="display:flex; gap:15px; font-size:0.9rem; align-items:center;">'
+        '<span title="Rating"><span class="material-symbols-rounded" style="font-size:16px;">star</span> '
+        + opp['Rating'].map("{:.1f}".format) + '</span>'
+        '<span title="Installs"><span class="material-symbols-rounded" style="font-size:16px;">download</span> '
+        + opp['Instalasi'].map("{:,}".format) + '</span>'
+        '<span title="ASO Score"><span class="material-symbols-rounded" style="font-size:16px;">build</span> '
+        + opp['Skor ASO'].astype(str) + '</span>'
+        '</div></div>'
+    )
+    return "".join(cards)
+
+
+def download_control(name, build, key):
+    """Format picker plus a download button that only builds the file when clicked."""
+    e1, e2 = st.columns([1, 2])
+    label = e1.selectbox("Format", list(EXPORT_FORMATS), key=f"export_fmt_{key}", label_visibility="collapsed")
+    ext, mime = EXPORT_FORMATS[label]
+    e2.download_button(f"📥 Unduh {label}", lambda: build(ext), f"{name}.{ext}", mime, key=f"export_{key}")
+
 
 # --- Page Config ---
 st.set_page_config(page_title="App Scout - Pencari Peluang Blue Ocean", layout="wide")
@@ -88,99 +157,91 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-# --- Utilities ---
-def parse_installs(installs_str):
-    if not installs_str: return 0
-    clean = re.sub(r'[^\d]', '', installs_str)
-    return int(clean) if clean else 0
-
-def get_aso_score(app_detail):
-    score = 100
-    if len(app_detail.get('title', '')) < 10: score -= 20
-    if len(app_detail.get('description', '')) < 500: score -= 20
-    if len(app_detail.get('screenshots', [])) < 3: score -= 20
-    if not app_detail.get('video'): score -= 10
-    return max(0, score)
-
-def clean_size(size_str):
-    if not size_str or 'Varies' in size_str or 'Bervariasi' in size_str:
-        return 0
-    try:
-        num = re.search(r'(\d+[.,]?\d*)', size_str)
-        if not num: return 0
-        val = float(num.group(1).replace(',', '.'))
-        if 'G' in size_str.upper(): val *= 1024
-        if 'k' in size_str.lower(): val /= 1024
-        return val
-    except:
-        return 0
-
-@st.cache_data(ttl=3600)
-def fetch_keyword_data(keywords, country, lang):
-    all_data = []
-    base_keywords = [k.strip() for k in keywords.split(",")]
-    expanded_keywords = set(base_keywords)
-    
-    with st.spinner("Mengembangkan kata kunci (Pro Feature)..."):
-        if suggestions:
-            for k in base_keywords:
-                try:
-                    suggs = suggestions(k, lang=lang, country=country)
-                    for s in suggs[:3]:
-                        expanded_keywords.add(s)
-                except:
-                    continue
-    
-    for kw in list(expanded_keywords):
-        with st.spinner(f"Mencari data untuk '{kw}'..."):
-            results = search(kw, lang=lang, country=country, n_hits=20)
-            for r in results:
-                try:
-                    detail = app(r['appId'], lang=lang, country=country)
-                    
-                    installs = parse_installs(detail.get('installs', '0'))
-                    rev_count = detail.get('reviews', 1)
-                    engagement = installs / rev_count if rev_count > 0 else 0
-                    
-                    last_updated = detail.get('updated')
-                    if last_updated:
-                        last_updated_date = datetime.fromtimestamp(last_updated)
-                        is_zombie = (datetime.now() - last_updated_date).days > 730
-                    else:
-                        is_zombie = False
-                        last_updated_date = None
-
-                    tier = "Pendatang Baru"
-                    if installs > 1000000: tier = "Raksasa (Hindari)"
-                    elif installs > 100000: tier = "Pemain Stabil"
-                    elif installs > 10000: tier = "Sedang Naik Daun"
-                    
-                    price = detail.get('price', 0)
-                    currency = detail.get('currency', 'USD')
-                    est_revenue = f"{currency} {installs * price:,.0f}" if price > 0 else "Gratis / Iklan"
-
-                    all_data.append({
-                        'Kata Kunci': kw,
-                        'Judul': detail.get('title'),
-                        'App ID': detail.get('appId'),
-                        'Rating': detail.get('score'),
-                        'Instalasi': installs,
-                        'Review': rev_count,
-                        'Engagement': engagement,
-                        'Ukuran (MB)': detail.get('size', 'Bervariasi').replace('M', '').replace('k', '/1024'),
-                        'Zombie App': is_zombie,
-                        'Update Terakhir': last_updated_date,
-                        'Ada Iklan': detail.get('adSupported', False),
-                        'IAP': detail.get('offersIAP', False),
-                        'Teks IAP': "Ya" if detail.get('offersIAP', False) else "Tidak",
-                        'Skor ASO': get_aso_score(detail),
-                        'Link': detail.get('url'),
-                        'Tier Kompetitor': tier,
-                        'Estimasi Omzet': est_revenue
-                    })
-                except Exception as e:
-                    continue
-    return pd.DataFrame(all_data)
+# --- Cached Resources ---
+@st.cache_resource
+def get_detail_cache():
+    return DetailCache(default_db_path())
+
+
+@st.cache_resource
+def get_scan_cache():
+    """Per-keyword scan results shared by all sessions; size via APP_SCOUT_SCAN_CACHE_MB."""
+    return ScanCache(max_bytes=int(os.environ.get("APP_SCOUT_SCAN_CACHE_MB", "64")) * 1024 * 1024)
+
+
+@st.cache_resource
+def get_suggestion_graph():
+    return SuggestionGraph(default_db_path())
+
+
+@st.cache_resource
+def get_review_store():
+    return ReviewStore(default_db_path())
+
+
+@st.cache_resource
+def get_watchlist():
+    return Watchlist(default_db_path())
+
+
+@st.cache_resource
+def get_watch_worker():
+    """One background refresher per server process (off with APP_SCOUT_WATCH_WORKER=0)."""
+    if os.environ.get("APP_SCOUT_WATCH_WORKER", "1") == "0":
+        return None
+    worker = WatchWorker(get_watchlist(), get_review_store())
+    worker.start()
+    return worker
+
+
+@st.cache_data(ttl=1800, show_spinner=False)
+def fetch_spy_analysis(app_id, country, lang, window_days=30, refresh_nonce=0):
+    """Fetch one competitor and precompute everything Competitor Spy shows.
+
+    Reviews come from the local review store, which is topped up with only
+    the reviews newer than the last sync. Cached per (appId, country, lang,
+    window) so widget reruns only re-render. `refresh_nonce` is just part of
+    the key: bump it to refetch.
+    """
+    detail = fetch_detail(app_id, country, lang)
+    store = get_review_store()
+    sync_reviews(store, app_id, country, lang, window_days=window_days, max_reviews=MAX_SYNC_REVIEWS)
+    rv_df = store.load(app_id, country, lang, since=datetime.now() - timedelta(days=window_days))
+    # Every fetch adds to the app's history, watched or not
+    watchlist = get_watchlist()
+    watchlist.record(app_id, country, lang, detail, snapshot_metrics(detail, rv_df))
+    return analyze_competitor(detail, rv_df, watchlist.history(app_id, country, lang), sentiment_cache=store)
+
+
+@st.cache_data(ttl=1800, show_spinner=False)
+def fetch_comparison(app_ids, country, lang, window_days=30, max_workers=8, rate_per_sec=10.0):
+    """Fetch and audit many competitors at once for the comparison table."""
+    watchlist = get_watchlist()
+    items, failures = fetch_competitors(get_review_store(), app_ids, country, lang, window_days=window_days,
+                                        max_reviews=MAX_SYNC_REVIEWS, max_workers=max_workers,
+                                        rate_per_sec=rate_per_sec)
+    for app_id, (detail, rv_df) in items.items():
+        watchlist.record(app_id, country, lang, detail, snapshot_metrics(detail, rv_df))
+    histories = {app_id: watchlist.history(app_id, country, lang) for app_id in items}
+    return compare_competitors(items, histories, sentiment_cache=get_review_store()), failures
+
+
+@st.cache_data(ttl=1800, show_spinner=False)
+def load_watched_analysis(app_id, country, lang, window_days=30, snapshot_at=None):
+    """Competitor Spy for a watched app, from local data only.
+
+    The watch worker keeps the detail, snapshots and reviews of the entry's
+    window up to date, so `window_days` must not exceed that window;
+    `snapshot_at` (the last refresh) keys the cache so a new refresh shows up.
+    """
+    watchlist = get_watchlist()
+    detail = watchlist.state(app_id, country, lang)['detail']
+    store = get_review_store()
+    rv_df = store.load(app_id, country, lang, since=datetime.now() - timedelta(days=window_days))
+    return analyze_competitor(detail, rv_df, watchlist.history(app_id, country, lang), sentiment_cache=store)
+
+# Watched competitors are refreshed outside the request path
+watch_worker = get_watch_worker()
 
 # --- UI Layout ---
 
@@ -194,57 +255,64 @@ with st.sidebar:
     st.subheader("Konfigurasi")
     country = st.text_input("Negara (Kode)", value="id", help="Contoh: id, us, sg")
     lang = st.text_input("Bahasa (Kode)", value="id", help="Contoh: id, en")
+    extra_markets = st.text_input("Pasar Pembanding", value="", placeholder="us:en, sg:en, my:ms",
+                                  help="Scan matriks: pasar tambahan (negara:bahasa, pisahkan koma) yang dipindai "
+                                       "bersamaan di Market Gap Hunter.")
+    markets = [(country, lang)]
+    for m in extra_markets.split(","):
+        m_country, _, m_lang = m.strip().lower().partition(":")
+        if m_country and m_lang:
+            markets.append((m_country, m_lang))
+    with st.expander("Pengaturan Lanjutan"):
+        max_workers = st.slider("Koneksi Paralel", 1, 32, 8, help="Jumlah request ke Play Store yang berjalan bersamaan.")
+        rate_per_sec = st.number_input("Batas Request / Detik", min_value=1.0, max_value=100.0, value=10.0, step=1.0,
+                                       help="Batas laju request agar tidak diblokir Play Store.")
+        expand_depth = st.slider("Kedalaman Ekspansi", 0, 3, 1,
+                                 help="Berapa tingkat saran kata kunci Play Store yang ditelusuri (0 = tanpa ekspansi).")
+        expand_fan_out = st.slider("Saran per Kata Kunci", 1, 10, 3,
+                                   help="Jumlah saran baru yang diambil dari tiap kata kunci per tingkat.")
+        n_hits = st.slider("Hasil per Kata Kunci", 10, 100, 20, step=10,
+                           help="Jumlah hasil pencarian Play Store yang diambil per kata kunci.")
+        two_tier = st.toggle("Saring Dulu (Scan 2 Tahap)",
+                             help="Detail aplikasi hanya diambil untuk hasil pencarian yang lolos saringan; "
+                                  "sisanya cukup dari data pencarian. Lebih luas, jauh lebih sedikit request.")
+        screen = None
+        if two_tier:
+            screen = {
+                'max_rating': st.number_input("Saring: Rating di bawah", 1.0, 5.0, SCREEN_DEFAULTS['max_rating'], 0.1),
+                'min_installs': st.number_input("Saring: Instalasi di atas", 0, None, SCREEN_DEFAULTS['min_installs'],
+                                                step=1000),
+                'max_aso': st.number_input("Saring: atau Skor ASO di bawah", 0, 100, SCREEN_DEFAULTS['max_aso']),
+            }
     st.divider()
     st.info("Tips: Gunakan kata kunci spesifik untuk hasil yang lebih baik.")
+    with st.expander("Waktu Muat Modul"):
+        report = import_report()
+        startup_ms = next((r['ms'] for r in report if r['module'] == "(startup) app.py"), 0)
+        if startup_ms > import_budget_ms():
+            st.warning(f"Startup {startup_ms:.0f} ms melebihi anggaran {import_budget_ms():.0f} ms.")
+        st.dataframe(pd.DataFrame(report), hide_index=True, use_container_width=True)
+    with st.expander("Daftar Pantauan"):
+        watched_df = get_watchlist().entries()
+        if watched_df.empty:
+            st.caption("Belum ada aplikasi yang dipantau. Aktifkan 'Pantau aplikasi ini' di Competitor Spy.")
+        else:
+            st.dataframe(watched_df[['app_id', 'country', 'lang', 'last_ok']], hide_index=True, use_container_width=True)
+        if watch_worker is None:
+            st.caption("Pembaruan latar belakang nonaktif (APP_SCOUT_WATCH_WORKER=0).")
+        elif watch_worker.last_cycle:
+            cycle = watch_worker.last_cycle
+            st.caption(f"Putaran terakhir {cycle['at']:%H:%M}: {cycle['refreshed']} diperbarui, {cycle['failed']} gagal.")
+    show_diagnostics = st.toggle("Panel Diagnostik", help="Latensi request, error, cache dan baris per tahap.")
+    # Filled in at the end of the script so it includes this run's work
+    diagnostics_slot = st.empty()
 
 # Main Tabs
-tab1, tab2 = st.tabs(["Market Gap Hunter", "Competitor Spy"])
+tab1, tab2, tab3 = st.tabs(["Market Gap Hunter", "Competitor Spy", "Bandingkan Kompetitor"])
 
 # ... (Previous code remains)
 
-# --- Helper: Decision Logic ---
-def get_market_decision(df):
-    avg_rating = df['Rating'].mean()
-    avg_installs = df['Instalasi'].mean()
-    opportunities = len(df[df['Rating'] < 4.0])
-    
-    if opportunities >= 3 and avg_installs > 10000:
-        return "POTENSI TINGGI (High Potential)", "green", \
-               f"Ditemukan {opportunities} aplikasi dengan permintaan tinggi tapi kualitas buruk (Rating < 4.0). Pasar ini 'haus' akan aplikasi yang lebih baik.", "check_circle"
-    elif avg_installs > 500000 and avg_rating > 4.2:
-        return "PERSAINGAN KETAT (Saturated)", "orange", \
-               "Pasar sudah dikuasai aplikasi raksasa dengan kualitas bagus. Kecuali Anda punya fitur revolusioner, akan sulit bersaing.", "warning"
-    elif avg_installs < 5000:
-        return "PASAR SEPI (Niche/Low Demand)", "red", \
-               "Volume pencarian/instalasi terlalu kecil. Mungkin kata kunci terlalu spesifik atau memang tidak ada peminat.", "cancel"
-    else:
-        return "NETRAL / MODERAT", "blue", \
-               "Ada peluang, tapi tidak terlalu mencolok. Perlu riset lebih dalam pada fitur spesifik.", "info"
-
-def get_competitor_decision(detail, rv_df):
-    score = detail.get('score', 0)
-    installs = parse_installs(detail.get('installs', '0'))
-    
-    # Calculate Velocity if available
-    velocity = 0
-    if not rv_df.empty:
-        last_30 = rv_df[rv_df['at'] > datetime.now() - timedelta(days=30)]
-        velocity = len(last_30)
-    
-    if score < 3.8 and installs > 50000:
-        return "SERANG SEKARANG (Vulnerable)", "success", \
-               f"Musuh sedang lemah! Rating {score:.1f} dengan banyak user ({installs}) artinya user kecewa tapi tidak ada pilihan lain. Masuk dan tawarkan solusi yang lebih stabil.", "gavel"
-    elif velocity > 100:
-        return "TUNGGANGI OMBAK (Viral)", "warning", \
-               f"Kompetitor sedang viral ({velocity} review/bulan). Jangan langsung *head-to-head*, tapi buat versi 'alternatif' atau 'lite' untuk mengambil tumpahan user mereka.", "trending_up"
-    elif score > 4.5 and installs > 1000000:
-        return "HINDARI (Dominant Leader)", "error", \
-               "Raja pasar yang sangat kuat. User puas (Rating 4.5+). Sangat mahal untuk merebut user mereka kecuali Anda punya budget marketing besar.", "shield"
-    else:
-        return "AMATI (Monitor)", "info", \
-               "Kompetitor standar. Cari celah spesifik di fitur yang tidak mereka miliki (lihat tab 'Kelemahan').", "visibility"
-
-with tab1:
+with tab1, METRICS.timed('render.market'):
     st.title("Pemburu Celah Pasar")
     st.markdown("Temukan *keyword* dengan permintaan tinggi namun persaingan rendah.")
     
@@ -260,8 +328,49 @@ with tab1:
             analyze_btn = st.button("Analisis Pasar", use_container_width=True)
 
     if analyze_btn:
-        df = fetch_keyword_data(kw_input, country, lang)
-        st.session_state.market_data = df
+        st.session_state.market_data = None
+        st.session_state.scan_status = None
+        batches = []
+        live = st.empty()
+        with live.container():
+            progress = st.progress(0.0, text="Mengembangkan kata kunci (Pro Feature)...")
+            # Pressing this reruns the script, which interrupts the scan; rows
+            # already collected stay in session_state.
+            st.button("Hentikan Pemindaian", key="cancel_scan")
+            live_metrics = st.empty()
+            live_chart = st.empty()
+            live_table = st.empty()
+
+        for batch in iter_market_data(kw_input, markets, max_workers, rate_per_sec, cache=get_detail_cache(),
+                                      depth=expand_depth, fan_out=expand_fan_out, graph=get_suggestion_graph(),
+                                      scan_cache=get_scan_cache(), n_hits=n_hits, screen=screen):
+            batches.append(batch['frame'])
+            df = concat_market_frames(batches)
+            st.session_state.market_data = df
+            st.session_state.scan_status = {k: batch[k] for k in ('done', 'total', 'failures')}
+
+            progress.progress(batch['done'] / batch['total'],
+                              text=f"Selesai '{batch['keyword']}' [{batch['market']}] ({batch['done']}/{batch['total']} kata kunci)")
+            if df.empty:
+                continue
+            with live_metrics.container():
+                m1, m2, m3 = st.columns(3)
+                m1.metric("Aplikasi Ditemukan", len(df))
+                m2.metric("Rating Rata-rata", f"{df['Rating'].mean():.1f}")
+                m3.metric("Kompetitor Lemah", len(df[df['Rating'] < 4.0]))
+            live_chart.plotly_chart(render.market_scatter(df, height=350, size=None, cached=False),
+                                    use_container_width=True, key=f"live_scatter_{batch['done']}")
+            live_table.dataframe(df[['Pasar', 'Kata Kunci', 'Judul', 'Rating', 'Instalasi', 'Skor ASO']], use_container_width=True)
+        live.empty()
+
+    scan_status = st.session_state.get('scan_status')
+    if scan_status:
+        if scan_status['done'] < scan_status['total']:
+            st.info(f"Pemindaian dihentikan. Menampilkan hasil parsial ({scan_status['done']}/{scan_status['total']} kata kunci).")
+        if scan_status['failures']:
+            fetch_failures = scan_status['failures']
+            detail_txt = ", ".join(f"{stage}: {n}" for stage, n in fetch_failures.items())
+            st.warning(f"{sum(fetch_failures.values())} request gagal setelah dicoba ulang ({detail_txt}).")
 
     if st.session_state.market_data is not None:
         df = st.session_state.market_data
@@ -274,7 +383,24 @@ with tab1:
             # Map simple colors to hex for inline style
             bg_map = {'green': '#e8f5e9', 'orange': '#fff3e0', 'red': '#ffebee', 'blue': '#e3f2fd'}
             color_map = {'green': '#2e7d32', 'orange': '#ef6c00', 'red': '#c62828', 'blue': '#1565c0'}
-            
+
+            if df['Pasar'].nunique() > 1:
+                st.subheader("Perbandingan Pasar")
+                decisions = market_decisions(df)
+                overall = decisions[decisions['Kata Kunci'] == "(semua)"]
+                for col, (_, dec) in zip(st.columns(len(overall)), overall.iterrows()):
+                    col.markdown(f"""
+                    <div style="padding:10px; border-radius:10px; background-color:{bg_map.get(dec['Warna'], '#f5f5f5')}; border: 1px solid {color_map.get(dec['Warna'], '#999')}; height:100%;">
+                        <b>{dec['Pasar']}</b><br>
+                        <span style="color:{color_map.get(dec['Warna'], '#333')}; font-weight:bold;">{dec['Keputusan']}</span><br>
+                        <small>{dec['Total Aplikasi']} aplikasi · rating {dec['Rating Rata-rata']:.1f} · {dec['Kompetitor Lemah']} lemah</small>
+                    </div>
+                    """, unsafe_allow_html=True)
+                st.write("")
+                per_kw = decisions[decisions['Kata Kunci'] != "(semua)"]
+                st.dataframe(per_kw.pivot(index='Kata Kunci', columns='Pasar', values='Keputusan'), use_container_width=True)
+                st.caption("Keputusan gabungan di bawah dihitung dari semua pasar sekaligus.")
+
             st.markdown(f"""
             <div style="padding:15px; border-radius:10px; background-color:{bg_map.get(dec_color, '#f5f5f5')}; border: 1px solid {color_map.get(dec_color, '#999')}; margin-bottom:20px;">
                 <h3 style="margin:0; color:{color_map.get(dec_color, '#333')}; display:flex; align-items:center; gap:10px;">
@@ -310,265 +436,390 @@ with tab1:
                 with c1:
                     with st.container(border=True):
                         st.subheader("Peta Persaingan")
-                        fig = px.scatter(df, x="Instalasi", y="Rating", color="Skor ASO", 
-                                         size="Review", hover_name="Judul", 
-                                         color_continuous_scale="RdYlGn", height=400)
-                        st.plotly_chart(fig, use_container_width=True)
+                        st.plotly_chart(render.market_scatter(df), use_container_width=True)
                 
                 with c2:
                     with st.container(border=True):
                         st.subheader("Peluang 'Lite'")
-                        df['Size_Numeric'] = df['Ukuran (MB)'].apply(clean_size)
-                        fig_lite = px.scatter(df, x="Size_Numeric", y="Instalasi", color="Rating", hover_name="Judul", height=400)
-                        st.plotly_chart(fig_lite, use_container_width=True)
+                        st.plotly_chart(render.lite_scatter(df), use_container_width=True)
             
             with res_tab2:
-                # Opportunities Logic (Relaxed Criteria)
-                opp_df = df[(df['Rating'] < 4.2) & (df['Instalasi'] > 10000)].copy()
-                opp_df['Tipe_Peluang'] = "Kualitas Rendah, Demand Cukup"
-                
-                zombie_df = df[df['Zombie App']].copy()
-                zombie_df['Tipe_Peluang'] = "Zombie App (Lama Tidak Update)"
-                
-                low_aso = df[df['Skor ASO'] < 50].copy()
-                low_aso['Tipe_Peluang'] = "ASO Lemah (Mudah Disalip)"
-                
-                final_opp = pd.concat([opp_df, zombie_df, low_aso]).drop_duplicates(subset=['App ID'])
+                final_opp = find_opportunities(df)
                 
                 if not final_opp.empty:
                     st.success(f"Ditemukan {len(final_opp)} aplikasi target!")
-                    for _, row in final_opp.iterrows():
-                        st.markdown(f"""
-                            <div class="opportunity-card">
-                                <div style="display:flex; justify-content:space-between; align-items:center;">
-                                    <h4 style="margin:0;"><span class="material-symbols-rounded" style="font-size:18px; vertical-align:middle;">target</span> {row['Judul']}</h4>
-                                    <span class="badge-tier">{row.get('Tier Kompetitor', 'N/A')}</span>
-                                </div>
-                                <p style="margin-bottom:10px; font-size:0.8em; color:#777;"><i>{row['App ID']}</i></p>
-                                <p><b>Celah:</b> {row['Tipe_Peluang']}</p>
-                                <hr style="margin:8px 0; border-top:1px solid #eee;">
-                                <div style="display:flex; gap:15px; font-size:0.9rem; align-items:center;">
-                                    <span title="Rating"><span class="material-symbols-rounded" style="font-size:16px;">star</span> {row['Rating']:.1f}</span>
-                                    <span title="Installs"><span class="material-symbols-rounded" style="font-size:16px;">download</span> {row['Instalasi']:,}</span>
-                                    <span title="ASO Score"><span class="material-symbols-rounded" style="font-size:16px;">build</span> {row['Skor ASO']}</span>
-                                </div>
-                            </div>
-                        """, unsafe_allow_html=True)
-                        
-                        if st.button(f"Mata-matai {row['Judul'][:15]}...", key=f"btn_{row['App ID']}", help="Analisis detail aplikasi ini"):
-                            st.session_state.current_app_id = row['App ID']
-                            st.session_state.analyze_active = True
-                            st.toast(f"Siap! Pindah ke tab Competitor Spy untuk analisis {row['Judul']}.")
+                    f1, f2, f3 = st.columns([2, 1, 1])
+                    opp_types = f1.multiselect("Jenis Celah", sorted(final_opp['Tipe_Peluang'].unique()),
+                                               placeholder="Semua jenis celah")
+                    sort_by = f2.selectbox("Urutkan", list(OPPORTUNITY_SORTS))
+                    page_size = f3.selectbox("Per Halaman", [10, 20, 50], index=1)
+
+                    if opp_types:
+                        final_opp = final_opp[final_opp['Tipe_Peluang'].isin(opp_types)]
+                    col, ascending = OPPORTUNITY_SORTS[sort_by]
+                    final_opp = final_opp.sort_values(col, ascending=ascending, kind="stable")
+
+                    n_pages = max(1, -(-len(final_opp) // page_size))
+                    page = st.number_input(f"Halaman (dari {n_pages})", 1, n_pages, 1) if n_pages > 1 else 1
+                    page_df = final_opp.iloc[(page - 1) * page_size:page * page_size]
+                    st.markdown(opportunity_cards_html(page_df), unsafe_allow_html=True)
+
+                    # One selection control for the whole page instead of a button per card
+                    s1, s2 = st.columns([3, 1])
+                    # The same app can be an opportunity in several markets
+                    titles = dict(zip(zip(page_df['App ID'], page_df['Pasar'].astype(str)),
+                                      page_df['Judul'] + " [" + page_df['Pasar'].astype(str) + "]"))
+                    target = s1.selectbox("Pilih aplikasi untuk dimata-matai", list(titles), format_func=titles.get)
+                    s2.write("")
+                    s2.write("")
+                    if s2.button("Mata-matai", use_container_width=True, help="Analisis detail aplikasi ini"):
+                        st.session_state.current_app_id = target[0]
+                        st.session_state.spy_market = tuple(target[1].split("/", 1))
+                        st.session_state.analyze_active = True
+                        st.toast(f"Siap! Pindah ke tab Competitor Spy untuk analisis {titles[target]}.")
+                    if st.button(f"Bandingkan {min(len(final_opp), MAX_COMPARE)} Teratas",
+                                 help="Kirim daftar peluang (sesuai filter & urutan) ke tab Bandingkan Kompetitor."):
+                        st.session_state.compare_ids = "\n".join(final_opp['App ID'].unique()[:MAX_COMPARE])
+                        st.toast("Siap! Buka tab Bandingkan Kompetitor.")
                 else:
                     st.info("Belum ada peluang yang sangat menonjol.")
 
             with res_tab3:
-                st.dataframe(df, use_container_width=True)
-                csv = df.to_csv(index=False).encode('utf-8')
-                st.download_button("📥 Unduh CSV", csv, "market_gap.csv", "text/csv")
+                st.dataframe(df, use_container_width=True, column_config=MARKET_COLUMN_CONFIG)
+                screened = df[~df['Detail']]
+                if not screened.empty:
+                    st.caption(f"{len(screened)} dari {len(df)} baris hanya berisi data pencarian "
+                               "(ulasan, ukuran, update, iklan, IAP dan status zombie kosong).")
+                    d1, d2 = st.columns([3, 1])
+                    labels = dict(zip(screened.index, screened['Judul'] + " · " + screened['Kata Kunci'].astype(str)
+                                      + " [" + screened['Pasar'].astype(str) + "]"))
+                    open_rows = d1.multiselect("Lengkapi detail", list(labels), format_func=labels.get,
+                                               placeholder="Pilih baris...")
+                    d2.write("")
+                    d2.write("")
+                    if d2.button("Ambil Detail", disabled=not open_rows, use_container_width=True):
+                        with st.spinner("Mengambil detail aplikasi..."):
+                            df, detail_failures = fetch_row_details(df, open_rows, cache=get_detail_cache(),
+                                                                    max_workers=max_workers, rate_per_sec=rate_per_sec)
+                        st.session_state.market_data = df
+                        st.session_state.detail_failures = detail_failures
+                        st.rerun()
+                detail_failures = st.session_state.pop('detail_failures', None)
+                if detail_failures:
+                    st.warning(f"{sum(detail_failures.values())} detail gagal diambil setelah dicoba ulang.")
+                download_control("market_gap", lambda fmt: export_frame(df, fmt), key="market")
         else:
             st.warning("Tidak ada data ditemukan.")
 
-with tab2:
+with tab2, METRICS.timed('render.spy'):
     st.markdown('<h1>Mata-mata Kompetitor</h1>', unsafe_allow_html=True)
     st.markdown("Analisis mendalam kelemahan dan strategi lawan.")
     
     if 'current_app_id' not in st.session_state: st.session_state.current_app_id = "com.whatsapp"
     if 'analyze_active' not in st.session_state: st.session_state.analyze_active = False
+    if 'spy_refresh' not in st.session_state: st.session_state.spy_refresh = {}
+    # Market of an app sent from Peluang Emas; None means the sidebar market
+    if 'spy_market' not in st.session_state: st.session_state.spy_market = None
 
     with st.container(border=True):
-        c_in1, c_in2 = st.columns([3, 1])
+        c_in1, c_in2, c_in3 = st.columns([3, 1, 1])
         with c_in1:
             app_id_input = st.text_input("App ID Kompetitor", value=st.session_state.current_app_id)
+            window_days = st.select_slider("Rentang Review (Hari)", options=[30, 90, 180, 365], value=30,
+                                           help="Review disimpan lokal; kunjungan berikutnya hanya mengambil review baru.")
         with c_in2:
             st.write("")
             st.write("")
             spy_btn = st.button("Mulai Mata-matai", use_container_width=True) # Removed emoji
+        with c_in3:
+            st.write("")
+            st.write("")
+            refresh_btn = st.button("Muat Ulang Data", use_container_width=True, help="Ambil ulang data terbaru dari Play Store.")
 
     if spy_btn:
+        if app_id_input != st.session_state.current_app_id:
+            st.session_state.spy_market = None
         st.session_state.current_app_id = app_id_input
         st.session_state.analyze_active = True
 
+    spy_country, spy_lang = st.session_state.spy_market or (country, lang)
+    spy_key = (st.session_state.current_app_id, spy_country, spy_lang, window_days)
+    if st.session_state.spy_market:
+        st.caption(f"Pasar: {market_label(spy_country, spy_lang)} (dari Peluang Emas).")
+    if refresh_btn:
+        st.session_state.spy_refresh[spy_key] = st.session_state.spy_refresh.get(spy_key, 0) + 1
+        st.session_state.analyze_active = True
+
     if st.session_state.analyze_active:
         try:
+            watched = get_watchlist().state(*spy_key[:3])
             with st.spinner("Sedang membedah aplikasi lawan..."):
-                detail = app(st.session_state.current_app_id, lang=lang, country=country)
-                
-                # --- Get Reviews & calc Trend (Pro Feature) ---
-                rv_data_trend, _ = reviews(st.session_state.current_app_id, lang=lang, country=country, count=300, sort=Sort.NEWEST)
-                rv_df_trend = pd.DataFrame(rv_data_trend)
-                
-                # --- DECISION LOGIC FOR TAB 2 ---
-                dec_title, dec_color, dec_reason, dec_icon = get_competitor_decision(detail, rv_df_trend)
-                
-                # Map simple colors to hex
-                bg_map = {'green': '#e8f5e9', 'orange': '#fff3e0', 'red': '#ffebee', 'blue': '#e3f2fd'} # Note: tab 2 used diff logic names, let's align
-                # get_competitor_decision returns success/warning/error/info
-                # Mapping Streamlit status to colors: success->green, warning->orange, error->red, info->blue
-                status_map = {'success': 'green', 'warning': 'orange', 'error': 'red', 'info': 'blue'}
-                final_color = status_map.get(dec_color, 'blue')
-                
-                bg_map = {'green': '#e8f5e9', 'orange': '#fff3e0', 'red': '#ffebee', 'blue': '#e3f2fd'}
-                color_map = {'green': '#2e7d32', 'orange': '#ef6c00', 'red': '#c62828', 'blue': '#1565c0'}
-
-                st.markdown(f"""
-                <div style="padding:15px; border-radius:10px; background-color:{bg_map.get(final_color)}; border: 1px solid {color_map.get(final_color)}; margin-bottom:20px;">
-                    <h3 style="margin:0; color:{color_map.get(final_color)}; display:flex; align-items:center; gap:10px;">
-                        <span class="material-symbols-rounded">{dec_icon}</span> {dec_title}
-                    </h3>
-                    <p style="margin-top:5px; margin-bottom:0; color:#333;"><b>Analisis AI:</b> {dec_reason}</p>
-                </div>
-                """, unsafe_allow_html=True)
-                # -------------------------------
-
-                # --- Top Section: Profile ---
-                with st.container(border=True):
-                    head1, head2, head3 = st.columns([1, 4, 2])
-                    with head1:
-                        st.image(detail['icon'], width=100)
-                    with head2:
-                        st.subheader(detail['title'])
-                        st.caption(detail['developer'])
-                        st.write(detail['summary'])
-                    with head3:
-                        st.metric("Instalasi", detail['installs'])
-                        st.metric("Rating", f"{detail['score']:.1f} ⭐")
-
-                with st.expander("📚 Panduan: Apa yang harus saya pelajari dari musuh?"):
-                    st.markdown("""
-                    - **Cek 'Traction' (Tab Kelemahan)**: Jika "🔥 VIRAL", hati-hati, mereka sedang naik daun. Jika "💀 Sepi", mereka mungkin sudah ditinggalkan user.
-                    - **Tren Sentimen**: Lihat grafiknya. Jika menurun 📉, berarti update terakhir mereka bermasalah. Ini celah masuk!
-                    - **Strategi AI (Tab 2)**: AI akan membacakan ribuan review untuk Anda dan menyimpulkan: *Apa yang paling dibenci user dari aplikasi ini?* (Misal: Iklan kebanyakan, Login susah). **JANGAN ULANGI KESALAHAN ITU.**
-                    """)
-
-                # --- Analysis Tabs ---
-                spy_tab1, spy_tab2, spy_tab3 = st.tabs(["📉 Kelemahan & Review", "🔮 Strategi AI", "⚙️ Teknis"])
-                
-                monthly_velocity = 0
-                hype_status = "Tidak Diketahui"
-                
-                if not rv_df_trend.empty:
-                    rv_df_trend['at'] = pd.to_datetime(rv_df_trend['at'])
-                    rv_df_trend['date'] = rv_df_trend['at'].dt.date
-                    
-                    last_30_days = rv_df_trend[rv_df_trend['at'] > datetime.now() - timedelta(days=30)]
-                    monthly_velocity = len(last_30_days)
-                    hype_status = "🔥 VIRAL" if monthly_velocity > 50 else "Stabil" if monthly_velocity > 10 else "💀 Sepi"
-
-                with spy_tab1:
-                     col_s1, col_s2 = st.columns([1, 2])
-                     with col_s1:
-                         with st.container(border=True):
-                             st.metric("Traction (30 Hari)", f"{monthly_velocity} Ulasan", hype_status)
-                             st.caption("Indikator seberapa aktif user baru.")
-                     
-                     with col_s2:
-                         if not rv_df_trend.empty:
-                            daily_sentiment = rv_df_trend.groupby('date')['score'].mean().reset_index()
-                            fig_trend = px.line(daily_sentiment, x='date', y='score', 
-                                                title="Tren Sentimen (Memburuk/Membaik?)", markers=True, height=250)
-                            fig_trend.update_layout(margin=dict(l=20, r=20, t=30, b=20))
-                            st.plotly_chart(fig_trend, use_container_width=True)
-
-                     st.divider()
-                     
-                     if not rv_df_trend.empty:
-                        neg_reviews = rv_df_trend[rv_df_trend['score'] <= 2]
-                        
-                        c_pie, c_cloud = st.columns([1, 1])
-                        with c_pie:
-                            fig_sent = px.pie(rv_df_trend, names='score', title="Komposisi Rating", height=450, hole=0.5)
-                            fig_sent.update_layout(legend=dict(orientation="h", y=-0.1, x=0.5, xanchor="center", yanchor="top"))
-                            st.plotly_chart(fig_sent, use_container_width=True)
-                        
-                        with c_cloud:
-                             if not neg_reviews.empty:
-                                all_text = " ".join(neg_reviews['content'].astype(str))
-                                wc = WordCloud(width=400, height=300, background_color='white', colormap='Reds').generate(all_text)
-                                fig_wc, ax = plt.subplots()
-                                ax.imshow(wc, interpolation='bilinear')
-                                ax.axis("off")
-                                plt.title("Keluhan Utama")
-                                st.pyplot(fig_wc)
-                             else:
-                                 st.info("Belum ada review negatif signifikan.")
-
-                        # Review Search
-                        with st.expander("🔍 Cari Review Spesifik"):
-                            search_rv = st.text_input("Ketik kata kunci (misal: 'login', 'mahal')", "")
-                            if search_rv:
-                                results = rv_df_trend[rv_df_trend['content'].str.contains(search_rv, case=False, na=False)]
-                                st.dataframe(results[['userName', 'score', 'content', 'at']], use_container_width=True)
-
-                with spy_tab2:
-                    if not rv_df_trend.empty and not neg_reviews.empty:
-                        # Logic for clusters
-                        clusters = {
-                            "Performa": ["lambat", "lag", "macet", "lemot", "slow", "crash", "freeze"],
-                            "Iklan": ["iklan", "ads", "ganggu", "annoying", "pop up"],
-                            "UX/UI": ["bingung", "jelek", "sulit", "complex", "ugly", "difficult", "hard", "bad ui"],
-                            "Koneksi": ["internet", "koneksi", "sinyal", "login", "masuk", "daftar"],
-                            "Harga/IAP": ["mahal", "bayar", "uang", "money", "price", "pay", "purchase"]
-                        }
-                        top_pain_point = ""
-                        max_count = 0
-                        
-                        # Clustering Display
-                        with st.container(border=True):
-                            st.subheader("⚠️ Top Keluhan User")
-                            cols_pain = st.columns(len(clusters))
-                            idx = 0
-                            for cat, keywords in clusters.items():
-                                count = sum(any(k in txt.lower() for k in keywords) for txt in neg_reviews['content'])
-                                if count > 0:
-                                    cols_pain[idx % 5].metric(cat, f"{count} Keluhan")
-                                    if count > max_count:
-                                        max_count = count
-                                        top_pain_point = cat
-                                    idx += 1
-
-                        # AI Strategy Box
-                        wishlist_regex = r"(wish|please|add|could you|want|hope|missing|tolong|tambah|harap|kurang|kapan)"
-                        wishlist = neg_reviews[neg_reviews['content'].str.contains(wishlist_regex, case=False, na=False)]
-                        top_wish = wishlist['content'].iloc[0][:50] if not wishlist.empty else "Fitur simpel & tanpa iklan"
-
-                        st.markdown(f"""
-                        <div class="opportunity-card" style="border-left-color: #4CAF50;">
-                            <h4 style="color: #4CAF50 !important;">🏆 Strategi Menang (AI Recommendation)</h4>
-                            <ol>
-                                <li><b>Serang Kelemahan:</b> Fokus perbaiki masalah <b>{top_pain_point if top_pain_point else "UX/UI"}</b> yang banyak dikeluhkan.</li>
-                                <li><b>Kabulkan Permintaan:</b> User meminta: <i>"{top_wish}..."</i>. Wujudkan ini!</li>
-                                <li><b>Branding:</b> { 'Tonjolkan fitur Privasi & Keamanan.' if detail.get('permissions') else 'Tonjolkan aplikasi Ringan & Cepat.' }</li>
-                            </ol>
-                        </div>
-                        """, unsafe_allow_html=True)
-
-                        # N-Grams
-                        st.subheader("Analisis Konteks (Bigrams)")
-                        words = re.findall(r'\w+', all_text.lower())
-                        bigrams = ngrams(words, 2)
-                        top_bigrams = Counter(bigrams).most_common(5)
-                        cols_gram = st.columns(5)
-                        for i, (bg, count) in enumerate(top_bigrams):
-                            cols_gram[i].markdown(f"**{bg[0]} {bg[1]}** ({count}x)")
-                    else:
-                        st.info("Data review tidak cukup untuk analisis AI.")
-
-                with spy_tab3:
-                    st.subheader("🛡️ Audit Izin (Permissions)")
-                    perms = detail.get('permissions', [])
-                    critical_keywords = ['location', 'contacts', 'sms', 'calendar', 'camera', 'microphone']
-                    raised = [p['permission'] for p in perms if any(k in p['permission'].lower() for k in critical_keywords)]
-                    
-                    if raised:
-                        st.error(f"⚠️ Ditemukan {len(raised)} Izin Sensitif:")
-                        for p in raised:
-                            st.code(p, language="text")
-                    else:
-                        st.success("✅ Aplikasi ini relatif aman (minim izin sensitif).")
-                    
-                    with st.expander("Lihat Semua Data Teknis"):
-                        st.json(detail)
+                if watched and watched['detail'] and not refresh_btn and window_days <= watched['window_days']:
+                    spy = load_watched_analysis(*spy_key, snapshot_at=watched['last_ok'])
+                else:
+                    spy = fetch_spy_analysis(*spy_key, refresh_nonce=st.session_state.spy_refresh.get(spy_key, 0))
+            if watched and window_days > watched['window_days']:
+                # Synced up to the wider window just now; keep it that way
+                get_watchlist().widen(*spy_key)
+            detail = spy['detail']
+            rv_df_trend = spy['reviews']
+            neg_reviews = spy['neg_reviews']
+
+            # --- DECISION LOGIC FOR TAB 2 ---
+            dec_title, dec_color, dec_reason, dec_icon = spy['decision']
+
+            # get_competitor_decision returns success/warning/error/info
+            # Mapping Streamlit status to colors: success->green, warning->orange, error->red, info->blue
+            status_map = {'success': 'green', 'warning': 'orange', 'error': 'red', 'info': 'blue'}
+            final_color = status_map.get(dec_color, 'blue')
+
+            bg_map = {'green': '#e8f5e9', 'orange': '#fff3e0', 'red': '#ffebee', 'blue': '#e3f2fd'}
+            color_map = {'green': '#2e7d32', 'orange': '#ef6c00', 'red': '#c62828', 'blue': '#1565c0'}
+
+            st.markdown(f"""
+            <div style="padding:15px; border-radius:10px; background-color:{bg_map.get(final_color)}; border: 1px solid {color_map.get(final_color)}; margin-bottom:20px;">
+                <h3 style="margin:0; color:{color_map.get(final_color)}; display:flex; align-items:center; gap:10px;">
+                    <span class="material-symbols-rounded">{dec_icon}</span> {dec_title}
+                </h3>
+                <p style="margin-top:5px; margin-bottom:0; color:#333;"><b>Analisis AI:</b> {dec_reason}</p>
+            </div>
+            """, unsafe_allow_html=True)
+            # -------------------------------
+
+            # --- Top Section: Profile ---
+            with st.container(border=True):
+                head1, head2, head3 = st.columns([1, 4, 2])
+                with head1:
+                    st.image(detail['icon'], width=100)
+                with head2:
+                    st.subheader(detail['title'])
+                    st.caption(detail['developer'])
+                    st.write(detail['summary'])
+                with head3:
+                    st.metric("Instalasi", detail['installs'])
+                    st.metric("Rating", f"{detail['score']:.1f} ⭐")
+
+            watch_on = st.toggle("Pantau aplikasi ini", value=watched is not None,
+                                 help="Data aplikasi diperbarui otomatis di latar belakang dan riwayatnya disimpan.")
+            if watch_on and watched is None:
+                get_watchlist().add(*spy_key[:3], window_days=window_days)
+                get_watchlist().record(*spy_key[:3], detail, snapshot_metrics(detail, rv_df_trend))
+                st.toast("Ditambahkan ke daftar pantauan.")
+            elif not watch_on and watched is not None:
+                get_watchlist().remove(*spy_key[:3])
+                st.toast("Dihapus dari daftar pantauan.")
+
+            with st.expander("📚 Panduan: Apa yang harus saya pelajari dari musuh?"):
+                st.markdown("""
+                - **Cek 'Traction' (Tab Kelemahan)**: Jika "🔥 VIRAL", hati-hati, mereka sedang naik daun. Jika "💀 Sepi", mereka mungkin sudah ditinggalkan user.
+                - **Tren Sentimen**: Lihat grafiknya (nada teks review dan rating bintang harian). Jika menurun 📉, berarti update terakhir mereka bermasalah. Ini celah masuk!
+                - **Strategi AI (Tab 2)**: AI akan membacakan ribuan review untuk Anda dan menyimpulkan: *Apa yang paling dibenci user dari aplikasi ini?* (Misal: Iklan kebanyakan, Login susah). **JANGAN ULANGI KESALAHAN ITU.**
+                """)
+
+            # --- Analysis Tabs ---
+            spy_tab1, spy_tab2, spy_tab3 = st.tabs(["📉 Kelemahan & Review", "🔮 Strategi AI", "⚙️ Teknis"])
+
+            with spy_tab1:
+                 col_s1, col_s2 = st.columns([1, 2])
+                 with col_s1:
+                     with st.container(border=True):
+                         st.metric("Traction (30 Hari)", f"{spy['monthly_velocity']} Ulasan", spy['hype_status'])
+                         st.caption("Indikator seberapa aktif user baru.")
+                         st.caption(f"Dianalisis dari {len(rv_df_trend):,} review tersimpan ({window_days} hari terakhir).")
+
+                 with col_s2:
+                     if spy['daily_sentiment'] is not None:
+                        st.plotly_chart(render.sentiment_trend(spy['daily_sentiment']), use_container_width=True)
+
+                 trend = spy['trend']
+                 if trend:
+                     with st.container(border=True):
+                         h1, h2, h3 = st.columns(3)
+                         h1.metric(f"Rating (vs {trend['days']:.0f} hari lalu)", f"{detail['score']:.2f}",
+                                   f"{trend['rating_delta']:+.2f}")
+                         h2.metric("Review / 30 Hari", trend['velocity_now'], f"{trend['velocity_delta']:+d}")
+                         h3.metric("Instalasi", detail['installs'], f"{trend['installs_delta']:+,}")
+                         st.plotly_chart(render.watch_history(spy['history']), use_container_width=True)
+
+                 st.divider()
+
+                 if not rv_df_trend.empty:
+                    c_pie, c_cloud = st.columns([1, 1])
+                    with c_pie:
+                        st.plotly_chart(render.rating_pie(rv_df_trend['score']), use_container_width=True)
+
+                    with c_cloud:
+                         cloud_png = render.complaint_cloud(spy['term_freq']) if not neg_reviews.empty else None
+                         if cloud_png:
+                            st.image(cloud_png, caption="Keluhan Utama", use_container_width=True)
+                         else:
+                             st.info("Belum ada review negatif signifikan.")
+
+                    # Review Search
+                    with st.expander("🔍 Cari Review Spesifik"):
+                        search_rv = st.text_input("Ketik kata kunci (misal: login mahal, \"tidak bisa masuk\")", "",
+                                                  help="Kata juga cocok dengan awalannya (iklan → iklannya); "
+                                                       "frasa dalam tanda kutip dicari utuh.")
+                        q1, q2 = st.columns(2)
+                        search_all = q1.toggle("Semua aplikasi tersimpan",
+                                               help="Cari di review semua kompetitor yang pernah dimata-matai.")
+                        min_score, max_score = q2.slider("Rating Review", 1, 5, (1, 5))
+                        if search_rv:
+                            review_store = get_review_store()
+                            search_args = dict(apps=None if search_all else [spy_key[:3]], min_score=min_score,
+                                               max_score=max_score, since=datetime.now() - timedelta(days=window_days))
+                            if search_all:
+                                counts = review_store.search_counts(search_rv, **search_args)
+                                st.caption(f"{counts['matches'].sum()} review cocok di {len(counts)} aplikasi "
+                                           f"({window_days} hari terakhir).")
+                                st.dataframe(counts.rename(columns={'app_id': 'App ID', 'country': 'Negara', 'lang': 'Bahasa',
+                                                                    'matches': 'Review Cocok', 'avg_score': 'Rating Rata-rata'}),
+                                             hide_index=True, use_container_width=True)
+                            results = review_store.search(search_rv, **search_args)
+                            st.dataframe(results[(['app_id'] if search_all else []) + ['userName', 'score', 'content', 'at']],
+                                         use_container_width=True)
+
+                    with st.expander("📦 Ekspor Review"):
+                        st.caption("Seluruh review tersimpan untuk aplikasi ini (tidak hanya rentang yang dipilih).")
+                        download_control(f"reviews_{spy_key[0]}",
+                                         lambda fmt: export_bytes(get_review_store().iter_reviews(apps=[spy_key[:3]]), fmt),
+                                         key="spy_reviews")
+
+            with spy_tab2:
+                if not rv_df_trend.empty and not neg_reviews.empty:
+                    top_pain_point = spy['top_pain_point']
+
+                    # Clustering Display
+                    with st.container(border=True):
+                        st.subheader("⚠️ Top Keluhan User")
+                        cols_pain = st.columns(len(COMPLAINT_CLUSTERS))
+                        for idx, (cat, count) in enumerate(spy['pain_points'].items()):
+                            cols_pain[idx % 5].metric(cat, f"{count} Keluhan")
+
+                    # AI Strategy Box
+                    st.markdown(f"""
+                    <div class="opportunity-card" style="border-left-color: #4CAF50;">
+                        <h4 style="color: #4CAF50 !important;">🏆 Strategi Menang (AI Recommendation)</h4>
+                        <ol>
+                            <li><b>Serang Kelemahan:</b> Fokus perbaiki masalah <b>{top_pain_point if top_pain_point else "UX/UI"}</b> yang banyak dikeluhkan.</li>
+                            <li><b>Kabulkan Permintaan:</b> User meminta: <i>"{spy['top_wish']}..."</i>. Wujudkan ini!</li>
+                            <li><b>Branding:</b> { 'Tonjolkan fitur Privasi & Keamanan.' if detail.get('permissions') else 'Tonjolkan aplikasi Ringan & Cepat.' }</li>
+                        </ol>
+                    </div>
+                    """, unsafe_allow_html=True)
+
+                    # N-Grams
+                    st.subheader("Analisis Konteks (Bigrams)")
+                    cols_gram = st.columns(5)
+                    for i, (bg, count) in enumerate(spy['top_bigrams']):
+                        cols_gram[i].markdown(f"**{bg[0]} {bg[1]}** ({count}x)")
+                else:
+                    st.info("Data review tidak cukup untuk analisis AI.")
+
+            with spy_tab3:
+                st.subheader("🛡️ Audit Izin (Permissions)")
+                raised = spy['raised_permissions']
+
+                if raised:
+                    st.error(f"⚠️ Ditemukan {len(raised)} Izin Sensitif:")
+                    for p in raised:
+                        st.code(p, language="text")
+                else:
+                    st.success("✅ Aplikasi ini relatif aman (minim izin sensitif).")
+
+                with st.expander("Lihat Semua Data Teknis"):
+                    st.json(detail)
 
         except Exception as e:
             st.error(f"Gagal mengambil data: {e}")
+
+with tab3, METRICS.timed('render.compare'):
+    st.title("Bandingkan Kompetitor")
+    st.markdown("Audit banyak aplikasi sekaligus: keputusan, keluhan utama, dan izin sensitif dalam satu tabel.")
+
+    if 'compare_ids' not in st.session_state: st.session_state.compare_ids = ""
+
+    with st.container(border=True):
+        cmp_in1, cmp_in2 = st.columns([3, 1])
+        with cmp_in1:
+            compare_text = st.text_area("Daftar App ID (satu per baris atau pisahkan koma)", key="compare_ids",
+                                        height=120, help=f"Maksimal {MAX_COMPARE} aplikasi. Bisa diisi dari tab Peluang Emas.")
+        with cmp_in2:
+            compare_window = st.select_slider("Rentang Review (Hari)", options=[30, 90, 180, 365], value=30,
+                                              key="compare_window")
+            compare_btn = st.button("Bandingkan", use_container_width=True)
+
+    compare_ids = tuple(dict.fromkeys(a.strip() for a in compare_text.replace(",", "\n").splitlines() if a.strip()))
+    if compare_btn:
+        st.session_state.compare_active = compare_ids[:MAX_COMPARE]
+
+    active_ids = st.session_state.get('compare_active')
+    if active_ids:
+        if len(compare_ids) > MAX_COMPARE:
+            st.info(f"Hanya {MAX_COMPARE} aplikasi pertama yang dibandingkan.")
+        try:
+            with st.spinner(f"Membedah {len(active_ids)} aplikasi sekaligus..."):
+                comparison, _ = fetch_comparison(active_ids, country, lang, compare_window, max_workers, rate_per_sec)
+            fetched = set(comparison['App ID']) if not comparison.empty else set()
+            missing = [a for a in active_ids if a not in fetched]
+            if missing:
+                st.warning(f"Gagal mengambil {len(missing)} aplikasi: {', '.join(missing)}")
+            if not comparison.empty:
+                pct = st.column_config.ProgressColumn(format="percent", min_value=0.0, max_value=1.0)
+                st.dataframe(
+                    comparison.drop(columns='Status'), hide_index=True, use_container_width=True,
+                    column_config={
+                        'Rating': st.column_config.NumberColumn(format="%.2f"),
+                        'Instalasi': st.column_config.NumberColumn(format="localized"),
+                        'Review Negatif': pct,
+                        **{cat: pct for cat in COMPLAINT_CLUSTERS},
+                    })
+                st.caption("Review negatif = rating ≤ 2 atau teks bernada negatif. "
+                           "Kolom kategori keluhan = porsi review negatif yang menyebut kategori tersebut.")
+                with st.expander("📦 Ekspor"):
+                    st.write("Tabel perbandingan")
+                    download_control("competitor_comparison", lambda fmt: export_frame(comparison, fmt), key="compare_table")
+                    st.write("Seluruh review tersimpan dari aplikasi di atas")
+                    compared = [(app_id, country, lang) for app_id in comparison['App ID']]
+                    download_control("competitor_reviews",
+                                     lambda fmt: export_bytes(get_review_store().iter_reviews(apps=compared), fmt),
+                                     key="compare_reviews")
+
+                c1, c2 = st.columns([3, 1])
+                titles = dict(zip(comparison['App ID'], comparison['Judul']))
+                target = c1.selectbox("Pilih aplikasi untuk dimata-matai", list(titles), format_func=titles.get,
+                                      key="compare_target")
+                c2.write("")
+                c2.write("")
+                if c2.button("Mata-matai", use_container_width=True, key="compare_spy"):
+                    st.session_state.current_app_id = target
+                    st.session_state.spy_market = None
+                    st.session_state.analyze_active = True
+                    st.toast(f"Siap! Pindah ke tab Competitor Spy untuk analisis {titles[target]}.")
+        except Exception as e:
+            st.error(f"Gagal mengambil data: {e}")
+
+# --- Diagnostics Panel ---
+if show_diagnostics:
+    with diagnostics_slot.container():
+        snap = METRICS.snapshot()
+        st.caption("Latensi per request & tahap")
+        if snap['latency']:
+            lat_df = pd.DataFrame(snap['latency']).drop(columns='buckets')
+            st.dataframe(lat_df, hide_index=True, use_container_width=True)
+        for name, stats in snap['cache'].items():
+            ratio = f"{stats['hit_ratio']:.0%}" if stats['hit_ratio'] is not None else "-"
+            st.metric(f"Cache {name}", ratio, f"{stats['hit']} hit / {stats['miss']} miss", delta_color="off")
+        if snap['errors']:
+            st.caption("Error per jenis")
+            st.dataframe(pd.DataFrame(snap['errors']), hide_index=True, use_container_width=True)
+        if snap['rows']:
+            st.caption("Baris dihasilkan: " + ", ".join(f"{k} {v:,}" for k, v in snap['rows'].items()))
+        d1, d2 = st.columns(2)
+        d1.download_button("JSON", lambda: METRICS.to_json(imports=import_report()), "app_scout_metrics.json",
+                           "application/json", use_container_width=True)
+        d2.download_button("Prometheus", METRICS.to_prometheus, "app_scout_metrics.prom", "text/plain",
+                           use_container_width=True)
+        if st.button("Reset Metrik", use_container_width=True):
+            METRICS.reset()
+            st.rerun()
@@ -0,0 +1 @@
+"""Offline benchmarks for App Scout (see README, "Benchmarks")."""
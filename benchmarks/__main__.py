@@ -0,0 +1,185 @@
+"""Run the offline benchmarks: ``python -m benchmarks run --out bench.json``.
+
+Every benchmark runs against FakePlayStore, so results are repeatable and
+need no network. Results are written as JSON (one object per benchmark with
+min/median/mean wall time and benchmark-specific counters) for tracking
+regressions across releases.
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from benchmarks.fakeplay import FakePlayStore, installed, record_fixture
+from scout.core import SCREEN_DEFAULTS, analyze_competitor, build_market_frame, find_opportunities, market_record
+from scout.fetch import scan_keywords
+
+KEYWORDS = ["meditasi", "jadwal sholat", "resep masakan", "kamus inggris", "catatan keuangan",
+            "belajar coding", "alarm", "cuaca", "senam", "kalkulator"]
+
+
+def timed(fn, repeat):
+    """Run `fn` `repeat` times; return (timings, result of the last run)."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    return timings, result
+
+
+def summarize(name, params, timings, **extra):
+    return {
+        'name': name,
+        'params': params,
+        'runs': len(timings),
+        'min_s': round(min(timings), 6),
+        'median_s': round(statistics.median(timings), 6),
+        'mean_s': round(statistics.fmean(timings), 6),
+        **extra,
+    }
+
+
+def bench_scan(fake_kwargs, n_keywords, workers, repeat, screen=None, n_hits=20):
+    # A recorded fixture only covers its own seeds and expansion settings
+    fixture = fake_kwargs.get('fixture') or {}
+    seeds = fixture.get('seeds', KEYWORDS)[:n_keywords]
+    expand = {'depth': fixture.get('depth', 1), 'fan_out': fixture.get('fan_out', 3)}
+
+    def run():
+        fake = FakePlayStore(**fake_kwargs)
+        with installed(fake):
+            df, failures = scan_keywords(seeds, "id", "id", max_workers=workers, rate_per_sec=0,
+                                         screen=screen, n_hits=n_hits, **expand)
+        return df, failures, fake.calls
+
+    timings, (df, failures, calls) = timed(run, repeat)
+    params = {'keywords': len(seeds), 'workers': workers, 'n_hits': n_hits, 'screen': screen is not None,
+              **expand, **fake_kwargs}
+    return summarize("scan_keywords", params, timings, rows=len(df), detail_rows=int(df['Detail'].sum()),
+                     opportunities=len(find_opportunities(df)), failures=failures, calls=calls)
+
+
+def market_frame(n_rows, fake):
+    details = [fake._detail(i % fake.n_apps) for i in range(n_rows)]
+    return build_market_frame([market_record(KEYWORDS[i % len(KEYWORDS)], d) for i, d in enumerate(details)])
+
+
+def bench_opportunities(n_rows, repeat):
+    df = market_frame(n_rows, FakePlayStore(n_apps=max(n_rows, 1)))
+    timings, opp = timed(lambda: find_opportunities(df), repeat)
+    return summarize("find_opportunities", {'rows': n_rows}, timings, opportunities=len(opp))
+
+
+def bench_reviews(n_reviews, repeat):
+    fake = FakePlayStore()
+    detail = fake.app("com.fake.app.1")
+    corpus = fake.review_corpus("com.fake.app.1", size=n_reviews)
+    timings, spy = timed(lambda: analyze_competitor(detail, corpus), repeat)
+    median = statistics.median(timings)
+    return summarize("analyze_competitor", {'reviews': n_reviews}, timings,
+                     reviews_per_s=round(n_reviews / median) if median else None,
+                     negative_reviews=len(spy['neg_reviews']))
+
+
+def git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    fake_kwargs = {'latency_ms': args.latency_ms, 'error_rate': args.error_rate}
+    if args.fixture:
+        fake_kwargs['fixture'] = json.load(open(args.fixture, encoding="utf-8"))
+
+    results = []
+    for n in args.scan_keywords:
+        results.append(bench_scan(fake_kwargs, n, args.workers, args.repeat))
+        print(f"scan_keywords keywords={n}: {results[-1]['median_s']:.3f}s", file=sys.stderr)
+        results.append(bench_scan(fake_kwargs, n, args.workers, args.repeat, screen=SCREEN_DEFAULTS,
+                                  n_hits=args.screen_hits))
+        print(f"scan_keywords keywords={n} screen n_hits={args.screen_hits}: {results[-1]['median_s']:.3f}s, "
+              f"{results[-1]['calls']['app']} app()", file=sys.stderr)
+    for n in args.market_rows:
+        results.append(bench_opportunities(n, args.repeat))
+        print(f"find_opportunities rows={n}: {results[-1]['median_s']:.4f}s", file=sys.stderr)
+    for n in args.review_sizes:
+        results.append(bench_reviews(n, args.repeat))
+        print(f"analyze_competitor reviews={n}: {results[-1]['median_s']:.3f}s", file=sys.stderr)
+
+    for r in results:
+        r['params'].pop('fixture', None)
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec="seconds"),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'pandas': pd.__version__,
+            'fixture': args.fixture,
+        },
+        'results': results,
+    }
+    text = json.dumps(report, indent=2, default=str)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+def record(args):
+    record_fixture(args.keywords, args.out, country=args.country, lang=args.lang, n_hits=args.n_hits,
+                   depth=args.depth, fan_out=args.fan_out)
+    print(f"Fixture ditulis ke {args.out}", file=sys.stderr)
+    return 0
+
+
+def int_list(value):
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmark App Scout secara offline.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("run", help="Jalankan benchmark terhadap FakePlayStore.")
+    p.add_argument("--out", help="File hasil JSON (default: stdout).")
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--fixture", help="Fixture JSON hasil 'record' (default: data sintetis).")
+    p.add_argument("--latency-ms", type=float, default=20.0, help="Rata-rata latensi per request palsu.")
+    p.add_argument("--error-rate", type=float, default=0.0, help="Peluang request palsu gagal (0-1).")
+    p.add_argument("--workers", type=int, default=8)
+    p.add_argument("--scan-keywords", type=int_list, default=[3, 10], help="Jumlah kata kunci per scan, dipisah koma.")
+    p.add_argument("--screen-hits", type=int, default=100, help="n_hits untuk scan dua tahap.")
+    p.add_argument("--market-rows", type=int_list, default=[1000, 100000])
+    p.add_argument("--review-sizes", type=int_list, default=[300, 10000, 100000])
+    p.set_defaults(func=run)
+
+    r = sub.add_parser("record", help="Rekam respons Play Store asli menjadi fixture.")
+    r.add_argument("keywords", nargs="+")
+    r.add_argument("--out", required=True)
+    r.add_argument("--country", default="id")
+    r.add_argument("--lang", default="id")
+    r.add_argument("--n-hits", type=int, default=20)
+    r.add_argument("--depth", type=int, default=1, help="Kedalaman ekspansi saran kata kunci, seperti scan.")
+    r.add_argument("--fan-out", type=int, default=3, help="Saran baru maksimal per kata kunci per tingkat.")
+    r.set_defaults(func=record)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,241 @@
+"""Offline stand-in for the google_play_scraper functions App Scout uses.
+
+FakePlayStore serves search(), app(), reviews() and suggestions() either from
+a recorded fixture (see `record_fixture`) or from deterministic synthetic
+data, with configurable per-call latency and error injection. `installed()`
+swaps it in for the real scraper inside scout.fetch.
+"""
+import json
+import random
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import scout.fetch
+
+WORDS_NEG = ["lambat", "lag", "macet", "lemot", "crash", "iklan", "ads", "ganggu", "pop up", "bingung", "jelek",
+             "sulit", "login", "koneksi", "sinyal", "masuk", "mahal", "bayar", "slow", "annoying", "price"]
+WORDS_POS = ["bagus", "mantap", "keren", "membantu", "mudah", "good", "great", "nice", "useful", "love"]
+WORDS_FILL = ["aplikasi", "ini", "sangat", "tidak", "bisa", "saya", "tolong", "tambah", "fitur", "kapan", "update",
+              "the", "app", "is", "and", "please", "add", "it", "when", "after", "sering", "selalu"]
+
+
+class FakeToken:
+    """Mimics google_play_scraper's continuation token (only `.token` is read)."""
+
+    def __init__(self, token, count):
+        self.token = token
+        self.count = count
+
+
+class FakePlayStore:
+    """Fake scraper with recorded or synthetic data, latency and failures.
+
+    `latency_ms` is the mean per-call delay (uniformly jittered +/-50%),
+    `error_rate` the probability that a call raises, before any data is
+    returned. Call counts per function are kept in `calls`.
+    """
+
+    Sort = SimpleNamespace(NEWEST=2, MOST_RELEVANT=1)
+
+    def __init__(self, fixture=None, latency_ms=0.0, error_rate=0.0, n_apps=500, reviews_per_app=1000,
+                 seed=42):
+        self.fixture = fixture or {}
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.n_apps = n_apps
+        self.reviews_per_app = reviews_per_app
+        self.seed = seed
+        self.calls = {'search': 0, 'app': 0, 'reviews': 0, 'suggestions': 0}
+        self._lock = threading.Lock()
+        # Failures and latency jitter, seeded so runs inject the same sequence
+        self._random = random.Random(seed)
+        self._review_cache = {}
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        with open(path, encoding="utf-8") as fh:
+            return cls(fixture=json.load(fh), **kwargs)
+
+    def _rng(self, *key):
+        return random.Random(zlib.crc32(repr((self.seed,) + key).encode()))
+
+    def _call(self, name):
+        with self._lock:
+            self.calls[name] += 1
+            fail = self.error_rate and self._random.random() < self.error_rate
+            jitter = self._random.uniform(0.5, 1.5)
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000 * jitter)
+        if fail:
+            raise ConnectionError(f"injected {name} failure")
+
+    def search(self, query, n_hits=30, lang="en", country="us"):
+        self._call('search')
+        if 'search' in self.fixture:
+            return self.fixture['search'].get(query, [])[:n_hits]
+        rng = self._rng('search', query)
+        ids = rng.sample(range(self.n_apps), min(n_hits, self.n_apps))
+        return [self._search_hit(i) for i in ids]
+
+    def suggestions(self, query, lang="en", country="us"):
+        self._call('suggestions')
+        if 'suggestions' in self.fixture:
+            return self.fixture['suggestions'].get(query, [])
+        suffixes = ["gratis", "offline", "terbaik", "untuk pemula", "2025"]
+        return [f"{query} {s}" for s in self._rng('suggest', query).sample(suffixes, 4)]
+
+    def app(self, app_id, lang="en", country="us"):
+        self._call('app')
+        if 'app' in self.fixture:
+            if app_id not in self.fixture['app']:
+                raise scout.fetch.gps_exceptions.NotFoundError(f"App not found({app_id}).")
+            return self.fixture['app'][app_id]
+        return self._detail(int(app_id.rsplit('.', 1)[-1]))
+
+    def reviews(self, app_id, lang="en", country="us", sort=None, count=100, filter_score_with=None,
+                filter_device_with=None, continuation_token=None):
+        self._call('reviews')
+        if continuation_token is not None:
+            if continuation_token.token is None:
+                return [], continuation_token
+            offset, count = continuation_token.token, continuation_token.count
+        else:
+            offset = 0
+        items = self.review_corpus(app_id)
+        page = items[offset:offset + count]
+        nxt = offset + count if offset + count < len(items) else None
+        return page, FakeToken(nxt, count)
+
+    def review_corpus(self, app_id, size=None):
+        """All reviews of one app, newest first."""
+        if 'reviews' in self.fixture:
+            items = [dict(r, at=datetime.fromisoformat(r['at']),
+                          repliedAt=datetime.fromisoformat(r['repliedAt']) if r.get('repliedAt') else None)
+                     for r in self.fixture['reviews'].get(app_id, [])]
+            return items[:size] if size else items
+        size = size or self.reviews_per_app
+        key = (app_id, size)
+        if key not in self._review_cache:
+            self._review_cache[key] = synthetic_reviews(size, self._rng('reviews', app_id))
+        return self._review_cache[key]
+
+    def _search_hit(self, i):
+        d = self._detail(i)
+        return {k: d[k] for k in ('appId', 'title', 'icon', 'screenshots', 'score', 'genre', 'price', 'free',
+                                  'currency', 'video', 'videoImage', 'description', 'descriptionHTML',
+                                  'developer', 'installs')}
+
+    def _detail(self, i):
+        rng = self._rng('app', i)
+        installs = rng.choice([500, 5000, 50000, 100000, 500000, 1000000, 10000000])
+        price = rng.choice([0, 0, 0, 0.99, 2.99])
+        return {
+            'appId': f"com.fake.app.{i}",
+            'title': f"Fake App {i} " + rng.choice(["Pro", "Lite", "Plus", ""]),
+            'summary': "Synthetic app for benchmarks",
+            'description': "x" * rng.choice([100, 800, 3000]),
+            'descriptionHTML': "",
+            'developer': f"Dev {i % 37}",
+            'icon': "",
+            'genre': rng.choice(["Tools", "Lifestyle", "Health & Fitness"]),
+            'screenshots': [""] * rng.randint(0, 8),
+            'video': rng.choice([None, "https://example.invalid/v"]),
+            'videoImage': None,
+            'installs': f"{installs:,}+",
+            'score': round(rng.uniform(2.5, 4.9), 2),
+            'reviews': rng.randint(10, max(11, installs // 20)),
+            'size': rng.choice(["12M", "45M", "1.2G", "850k", "Varies with device"]),
+            'updated': int((datetime.now() - timedelta(days=rng.randint(1, 1500))).timestamp()),
+            'price': price,
+            'free': price == 0,
+            'currency': "USD",
+            'adSupported': rng.random() < 0.6,
+            'offersIAP': rng.random() < 0.4,
+            'url': f"https://play.google.com/store/apps/details?id=com.fake.app.{i}",
+            'permissions': [{'permission': p} for p in rng.sample(
+                ["approximate location", "read contacts", "take pictures", "full network access",
+                 "record audio", "read SMS", "view network connections"], 3)],
+        }
+
+
+def synthetic_reviews(size, rng):
+    now = datetime.now()
+    items = []
+    for n in range(size):
+        score = rng.choice([1, 1, 2, 3, 4, 5, 5, 5])
+        pool = WORDS_NEG if score <= 2 else WORDS_POS
+        words = rng.choices(WORDS_FILL, k=rng.randint(4, 30)) + rng.choices(pool, k=rng.randint(1, 4))
+        rng.shuffle(words)
+        items.append({
+            'reviewId': f"r{n}",
+            'userName': f"user{rng.randint(1, 10 ** 6)}",
+            'content': " ".join(words).capitalize(),
+            'score': score,
+            'thumbsUpCount': rng.randint(0, 50),
+            'appVersion': "1.0",
+            'at': now - timedelta(minutes=n * 7),
+            'replyContent': None,
+            'repliedAt': None,
+        })
+    return items
+
+
+@contextmanager
+def installed(fake):
+    """Route scout.fetch's Play Store calls to `fake` for the duration."""
+    original = scout.fetch.gps
+    scout.fetch.gps = fake
+    try:
+        yield fake
+    finally:
+        scout.fetch.gps = original
+
+
+class _Recorder:
+    """Pass-through scraper that keeps every suggestions() response in `fixture`."""
+
+    def __init__(self, gps, fixture):
+        self._gps = gps
+        self._fixture = fixture
+        if getattr(gps, 'suggestions', None):
+            self.suggestions = self._suggestions
+
+    def _suggestions(self, query, **kwargs):
+        result = self._gps.suggestions(query, **kwargs)
+        self._fixture['suggestions'][query] = result
+        return result
+
+    def __getattr__(self, name):
+        return getattr(self._gps, name)
+
+
+def record_fixture(keywords, path, country="id", lang="id", n_hits=20, review_count=200, depth=1, fan_out=3):
+    """Record live responses for a scan of `keywords` into a JSON fixture.
+
+    Keywords are expanded exactly like scan_keywords does (same `depth` and
+    `fan_out`), so every normalized and expanded keyword the benchmark
+    searches is in the fixture. The seeds and expansion settings are stored
+    too; `python -m benchmarks run --fixture` scans with them.
+    """
+    gps = scout.fetch.gps
+    fixture = {'search': {}, 'app': {}, 'reviews': {}, 'suggestions': {},
+               'seeds': list(keywords), 'depth': depth, 'fan_out': fan_out}
+    with installed(_Recorder(gps, fixture)), scout.fetch.FetchEngine(max_workers=1, rate_per_sec=2) as engine:
+        expanded = scout.fetch.expand_keywords(engine, keywords, [(country, lang)], depth=depth, fan_out=fan_out)
+    for kw in expanded[(country, lang)]:
+        hits = gps.search(kw, lang=lang, country=country, n_hits=n_hits)
+        fixture['search'][kw] = hits
+        for hit in hits:
+            app_id = hit['appId']
+            if app_id in fixture['app']:
+                continue
+            fixture['app'][app_id] = gps.app(app_id, lang=lang, country=country)
+            items, _ = gps.reviews(app_id, lang=lang, country=country, count=review_count, sort=gps.Sort.NEWEST)
+            fixture['reviews'][app_id] = items
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(fixture, fh, default=lambda v: v.isoformat() if isinstance(v, datetime) else str(v))
+    return fixture
@@ -0,0 +1 @@
+"""App Scout core: Play Store market scans and competitor analysis without the UI."""
@@ -0,0 +1,195 @@
+"""Headless batch scans: ``python -m scout scan keywords.txt --market id:id``.
+
+Runs the same scan and decision logic as the Market Gap Hunter tab without
+loading Streamlit, Plotly or matplotlib, and writes the market frame plus a
+per-market, per-keyword decision summary to CSV or Parquet. All markets are
+scanned together on one worker pool.
+
+``python -m scout watch run`` refreshes the competitor watchlist in the
+foreground (``--once`` for cron).
+"""
+import argparse
+import sys
+import time
+
+from scout.core import SCREEN_DEFAULTS, concat_market_frames, market_decisions, market_label
+from scout.export import format_for_path, frame_chunks, write_chunks
+from scout.fetch import iter_market_data
+from scout.lazy import DEFERRED_MODULES, STARTUP_MODULES, import_budget_ms, measure_cold_import
+from scout.metrics import METRICS
+from scout.store import DetailCache, ReviewStore, SuggestionGraph, Watchlist, default_db_path
+from scout.watch import WatchWorker
+
+
+def parse_market(value):
+    country, _, lang = value.partition(":")
+    if not country or not lang:
+        raise argparse.ArgumentTypeError(f"pasar harus berformat negara:bahasa, bukan '{value}'")
+    return country.strip().lower(), lang.strip().lower()
+
+
+def read_keywords(path):
+    stream = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    with stream:
+        lines = (line.split("#", 1)[0].strip() for line in stream)
+        return list(dict.fromkeys(line for line in lines if line))
+
+
+def write_frame(df, path):
+    if path.endswith(".json"):
+        df.to_json(path, orient="records", force_ascii=False, indent=2, date_format="iso")
+        return
+    try:
+        write_chunks(frame_chunks(df), path, format_for_path(path))
+    except RuntimeError as exc:
+        raise SystemExit(str(exc))
+
+
+def run_scan(args):
+    keywords = read_keywords(args.keywords)
+    if not keywords:
+        raise SystemExit("Tidak ada kata kunci di file input.")
+    cache = None if args.no_cache else DetailCache(args.cache_db)
+    graph = None if args.no_cache else SuggestionGraph(args.cache_db)
+    screen = None
+    if args.screen:
+        screen = {'max_rating': args.max_rating, 'min_installs': args.min_installs, 'max_aso': args.max_aso}
+
+    frames = []
+    failures = {}
+    started = time.monotonic()
+    for batch in iter_market_data(keywords, args.market, max_workers=args.workers, rate_per_sec=args.rate,
+                                  cache=cache, depth=0 if args.no_expand else args.depth, fan_out=args.fan_out,
+                                  graph=graph, n_hits=args.n_hits, screen=screen):
+        frames.append(batch['frame'])
+        failures = batch['failures']
+        if not args.quiet:
+            print(f"[{batch['market']}] {batch['done']}/{batch['total']} {batch['keyword']}: "
+                  f"{len(batch['frame'])} aplikasi", file=sys.stderr)
+
+    df = concat_market_frames(frames)
+    if df.empty:
+        print("Tidak ada data ditemukan.", file=sys.stderr)
+        return 1
+
+    write_frame(df, args.out)
+    summary = market_decisions(df).drop(columns='Warna')
+    if args.summary:
+        write_frame(summary, args.summary)
+    elif not args.quiet:
+        print(summary[summary['Kata Kunci'] == "(semua)"].to_string(index=False))
+
+    if args.metrics:
+        with open(args.metrics, "w", encoding="utf-8") as fh:
+            fh.write(METRICS.to_prometheus() if args.metrics.endswith(".prom") else METRICS.to_json())
+
+    if not args.quiet:
+        print(f"{len(df)} baris ditulis ke {args.out} dalam {time.monotonic() - started:.1f} detik.", file=sys.stderr)
+        for key, n in failures.items():
+            print(f"Gagal: {key} = {n}", file=sys.stderr)
+    return 0
+
+
+def run_imports(args):
+    startup_ms = measure_cold_import(STARTUP_MODULES)
+    print(f"{'startup (import awal app.py)':<32} {startup_ms:8.0f} ms")
+    for name in DEFERRED_MODULES:
+        print(f"{name + ' (ditunda)':<32} {measure_cold_import([name]):8.0f} ms")
+    budget = args.budget_ms if args.budget_ms is not None else import_budget_ms()
+    if startup_ms > budget:
+        print(f"Startup {startup_ms:.0f} ms melebihi anggaran {budget:.0f} ms.", file=sys.stderr)
+        return 1
+    return 0
+
+
+def run_watch(args):
+    watchlist = Watchlist(args.db)
+    if args.action == "add":
+        for app_id in args.app_ids:
+            watchlist.add(app_id, *args.market, interval_s=args.every * 3600, window_days=args.window)
+        print(f"{len(args.app_ids)} aplikasi dipantau di {market_label(*args.market)}.", file=sys.stderr)
+    elif args.action == "remove":
+        for app_id in args.app_ids:
+            watchlist.remove(app_id, *args.market)
+    elif args.action == "list":
+        entries = watchlist.entries()
+        print(entries.to_string(index=False) if not entries.empty else "Daftar pantauan kosong.")
+    else:
+        worker = WatchWorker(watchlist, ReviewStore(args.db), poll_s=args.poll, max_workers=args.workers,
+                             rate_per_sec=args.rate)
+        if args.once:
+            ok, failed = worker.run_once()
+            print(f"{ok} aplikasi diperbarui, {failed} gagal.", file=sys.stderr)
+            return 1 if failed else 0
+        try:
+            worker.run()
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m scout", description="App Scout tanpa antarmuka web.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    scan = sub.add_parser("scan", help="Pindai daftar kata kunci untuk satu atau beberapa pasar.")
+    scan.add_argument("keywords", help="File kata kunci, satu per baris ('-' untuk stdin).")
+    scan.add_argument("-m", "--market", type=parse_market, action="append",
+                      help="Pasar negara:bahasa, boleh diulang (default id:id).")
+    scan.add_argument("-o", "--out", default="market_gap.csv", help="File hasil (.csv, .csv.gz, .parquet, .arrow atau .json).")
+    scan.add_argument("-s", "--summary", help="File ringkasan keputusan (format sama dengan --out).")
+    scan.add_argument("--workers", type=int, default=8, help="Jumlah koneksi paralel.")
+    scan.add_argument("--rate", type=float, default=10.0, help="Batas request per detik.")
+    scan.add_argument("--depth", type=int, default=1, help="Kedalaman ekspansi saran kata kunci (0 = tanpa ekspansi).")
+    scan.add_argument("--fan-out", type=int, default=3, help="Saran baru maksimal per kata kunci per tingkat.")
+    scan.add_argument("--no-expand", action="store_true", help="Jangan kembangkan kata kunci (sama dengan --depth 0).")
+    scan.add_argument("--n-hits", type=int, default=20, help="Hasil pencarian per kata kunci.")
+    scan.add_argument("--screen", action="store_true",
+                      help="Scan dua tahap: detail aplikasi hanya diambil untuk hasil yang lolos saringan.")
+    scan.add_argument("--max-rating", type=float, default=SCREEN_DEFAULTS['max_rating'],
+                      help="Saringan: rating di bawah nilai ini (bersama --min-installs).")
+    scan.add_argument("--min-installs", type=int, default=SCREEN_DEFAULTS['min_installs'],
+                      help="Saringan: instalasi di atas nilai ini (bersama --max-rating).")
+    scan.add_argument("--max-aso", type=int, default=SCREEN_DEFAULTS['max_aso'],
+                      help="Saringan: atau skor ASO di bawah nilai ini.")
+    scan.add_argument("--cache-db", default=default_db_path(), help="Lokasi cache detail aplikasi dan saran (SQLite).")
+    scan.add_argument("--no-cache", action="store_true", help="Jangan pakai cache detail aplikasi dan saran.")
+    scan.add_argument("--metrics", help="Tulis metrik latensi/error/cache (.json atau .prom untuk Prometheus).")
+    scan.add_argument("-q", "--quiet", action="store_true")
+    scan.set_defaults(func=run_scan)
+
+    watch = sub.add_parser("watch", help="Kelola dan perbarui daftar pantauan kompetitor.")
+    watch.add_argument("--db", default=default_db_path(), help="Lokasi database lokal (SQLite).")
+    watch_sub = watch.add_subparsers(dest="action", required=True)
+    for action, help_text in (("add", "Tambahkan aplikasi ke daftar pantauan."),
+                              ("remove", "Hapus aplikasi dari daftar pantauan.")):
+        p = watch_sub.add_parser(action, help=help_text)
+        p.add_argument("app_ids", nargs="+")
+        p.add_argument("-m", "--market", type=parse_market, default=("id", "id"), help="Pasar negara:bahasa.")
+        if action == "add":
+            p.add_argument("--every", type=float, default=6.0, help="Interval pembaruan dalam jam.")
+            p.add_argument("--window", type=int, default=30, help="Rentang review yang disinkronkan, dalam hari.")
+    watch_sub.add_parser("list", help="Tampilkan daftar pantauan.")
+    run = watch_sub.add_parser("run", help="Perbarui aplikasi yang sudah jatuh tempo secara berkala.")
+    run.add_argument("--once", action="store_true", help="Satu putaran saja (untuk cron).")
+    run.add_argument("--poll", type=float, default=60.0, help="Jeda antar putaran dalam detik.")
+    run.add_argument("--workers", type=int, default=4, help="Jumlah koneksi paralel.")
+    run.add_argument("--rate", type=float, default=2.0, help="Batas request per detik.")
+    watch.set_defaults(func=run_watch)
+
+    imports = sub.add_parser("imports", help="Ukur waktu import saat cold start.")
+    imports.add_argument("--budget-ms", type=float,
+                         help="Anggaran waktu import startup (default APP_SCOUT_IMPORT_BUDGET_MS atau 1500).")
+    imports.set_defaults(func=run_imports)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "scan" and args.market is None:
+        args.market = [("id", "id")]
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
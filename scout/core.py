@@ -0,0 +1,422 @@
+"""Scan and scoring logic shared by the Streamlit app and the CLI.
+
+Nothing in here may import Streamlit, Plotly or matplotlib.
+"""
+import re
+import unicodedata
+from collections import Counter
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from scout.metrics import METRICS
+from scout.reviews import WISHLIST_REGEX, analyze_texts, complaint_flags, normalize_text
+from scout.sentiment import NEGATIVE_POLARITY, score_reviews
+
+
+def parse_installs(installs_str):
+    if not installs_str: return 0
+    clean = re.sub(r'[^\d]', '', installs_str)
+    return int(clean) if clean else 0
+
+def get_aso_score(app_detail):
+    score = 100
+    if len(app_detail.get('title', '')) < 10: score -= 20
+    if len(app_detail.get('description', '')) < 500: score -= 20
+    if len(app_detail.get('screenshots', [])) < 3: score -= 20
+    if not app_detail.get('video'): score -= 10
+    return max(0, score)
+
+TIER_DTYPE = pd.CategoricalDtype(
+    ["Pendatang Baru", "Sedang Naik Daun", "Pemain Stabil", "Raksasa (Hindari)"], ordered=True)
+
+# Column dtypes of the market frame. 'Estimasi Omzet' is installs * price in
+# 'Mata Uang' (0 for free apps) and 'Ukuran (MB)' is numeric (0 = varies);
+# both are formatted only when displayed. Rows without details ('Detail'
+# False) have NA for 'Review', 'Engagement', 'Ukuran (MB)', 'Zombie App',
+# 'Ada Iklan' and 'IAP'.
+MARKET_SCHEMA = {
+    'Pasar': 'category',
+    'Kata Kunci': 'category',
+    'Judul': 'str',
+    'App ID': 'str',
+    'Rating': 'float32',
+    'Instalasi': 'int64',
+    'Review': 'Int64',
+    'Engagement': 'float32',
+    'Ukuran (MB)': 'float32',
+    'Zombie App': 'boolean',
+    'Update Terakhir': 'datetime64[s]',
+    'Ada Iklan': 'boolean',
+    'IAP': 'boolean',
+    'Skor ASO': 'int16',
+    'Link': 'str',
+    'Tier Kompetitor': TIER_DTYPE,
+    'Estimasi Omzet': 'float64',
+    'Mata Uang': 'category',
+    'Detail': 'bool',
+}
+
+# Raw app() fields copied at ingestion, in the order build_market_frame reads them
+_RAW_FIELDS = ('title', 'appId', 'score', 'installs', 'reviews', 'size', 'updated', 'adSupported',
+               'offersIAP', 'url', 'price', 'currency')
+
+
+def normalize_keyword(keyword):
+    """Canonical form used to dedupe keyword variants ('Meditasi  ', 'meditasi')."""
+    return " ".join(unicodedata.normalize("NFKC", str(keyword)).casefold().split())
+
+
+def market_label(country, lang):
+    return f"{country}/{lang}"
+
+
+def market_record(kw, detail, full=True):
+    """The raw fields of one app() result that the market frame needs.
+
+    With `full=False`, `detail` is a search() hit: the fields it lacks
+    (reviews, size, update date, ads, IAP) stay empty and the row's 'Detail'
+    column is False.
+    """
+    return (kw, get_aso_score(detail), full) + tuple(detail.get(f) for f in _RAW_FIELDS)
+
+
+# Two-tier scan pre-filters: find_opportunities' rules on the fields search() returns
+SCREEN_DEFAULTS = {'max_rating': 4.2, 'min_installs': 10000, 'max_aso': 50}
+
+
+def screen_hit(hit, max_rating=4.2, min_installs=10000, max_aso=50):
+    """Whether a search() hit may be an opportunity and is worth an app() call.
+
+    Low rating with enough installs, or a weak ASO score. Zombie apps cannot
+    be screened: search() has no update date.
+    """
+    score = hit.get('score')
+    if score is not None and score < max_rating and parse_installs(str(hit.get('installs') or '')) > min_installs:
+        return True
+    return get_aso_score(hit) < max_aso
+
+
+def parse_size_mb(sizes):
+    """Vectorized size strings ('12M', '1.2G', '850k', 'Varies...') to MB."""
+    sizes = sizes.fillna("").astype(str)
+    num = pd.to_numeric(sizes.str.extract(r'(\d+[.,]?\d*)', expand=False).str.replace(',', '.'),
+                        errors='coerce').fillna(0.0)
+    num = num.where(~sizes.str.upper().str.contains('G'), num * 1024)
+    num = num.where(~sizes.str.lower().str.contains('k'), num / 1024)
+    return num.where(~sizes.str.contains('Varies|Bervariasi'), 0.0)
+
+
+def build_market_frame(records, market=""):
+    """Build the typed market frame of one market from market_record() tuples.
+
+    All parsing (installs, size, tier, revenue, zombie flag) happens here,
+    once, column-wise.
+    """
+    if not records:
+        return empty_market_frame()
+    cols = list(zip(*records))
+    kw, aso, full = cols[0], cols[1], cols[2]
+    raw = dict(zip(_RAW_FIELDS, (pd.Series(c) for c in cols[3:])))
+
+    installs = pd.to_numeric(raw['installs'].fillna('').astype(str).str.replace(r'[^\d]', '', regex=True),
+                             errors='coerce').fillna(0).astype('int64')
+    detail = pd.Series(full, dtype=bool)
+    rev_count = pd.to_numeric(raw['reviews'], errors='coerce').fillna(0).astype('int64')
+    updated = pd.to_datetime(pd.to_numeric(raw['updated'], errors='coerce'), unit='s')
+    price = pd.to_numeric(raw['price'], errors='coerce').fillna(0.0)
+
+    df = pd.DataFrame({
+        'Pasar': market,
+        'Kata Kunci': kw,
+        'Judul': raw['title'],
+        'App ID': raw['appId'],
+        'Rating': pd.to_numeric(raw['score'], errors='coerce'),
+        'Instalasi': installs,
+        'Review': rev_count.astype('Int64').where(detail),
+        'Engagement': (installs / rev_count.where(rev_count > 0)).fillna(0.0).where(detail),
+        'Ukuran (MB)': parse_size_mb(raw['size']).where(detail),
+        'Zombie App': (pd.Timestamp.now() - updated).dt.days.gt(730).astype('boolean').where(detail),
+        'Update Terakhir': updated,
+        'Ada Iklan': raw['adSupported'].fillna(False).astype('boolean').where(detail),
+        'IAP': raw['offersIAP'].fillna(False).astype('boolean').where(detail),
+        'Skor ASO': aso,
+        'Link': raw['url'].fillna("https://play.google.com/store/apps/details?id=" + raw['appId'].astype(str)),
+        'Tier Kompetitor': pd.cut(installs, [-1, 10000, 100000, 1000000, float('inf')],
+                                  labels=TIER_DTYPE.categories),
+        'Estimasi Omzet': installs * price,
+        'Mata Uang': raw['currency'].fillna('USD'),
+        'Detail': detail,
+    })
+    return df.astype(MARKET_SCHEMA)
+
+
+def empty_market_frame():
+    return pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in MARKET_SCHEMA.items()})
+
+
+def concat_market_frames(frames):
+    """Concatenate market frames, restoring categoricals merged into objects."""
+    frames = [f for f in frames if not f.empty]
+    if not frames:
+        return empty_market_frame()
+    df = pd.concat(frames, ignore_index=True)
+    extra = {col: dtype for col, dtype in MARKET_SCHEMA.items() if col in df.columns}
+    return df.astype(extra)
+
+
+def get_market_decision(df):
+    avg_rating = df['Rating'].mean()
+    avg_installs = df['Instalasi'].mean()
+    opportunities = len(df[df['Rating'] < 4.0])
+    
+    if opportunities >= 3 and avg_installs > 10000:
+        return "POTENSI TINGGI (High Potential)", "green", \
+               f"Ditemukan {opportunities} aplikasi dengan permintaan tinggi tapi kualitas buruk (Rating < 4.0). Pasar ini 'haus' akan aplikasi yang lebih baik.", "check_circle"
+    elif avg_installs > 500000 and avg_rating > 4.2:
+        return "PERSAINGAN KETAT (Saturated)", "orange", \
+               "Pasar sudah dikuasai aplikasi raksasa dengan kualitas bagus. Kecuali Anda punya fitur revolusioner, akan sulit bersaing.", "warning"
+    elif avg_installs < 5000:
+        return "PASAR SEPI (Niche/Low Demand)", "red", \
+               "Volume pencarian/instalasi terlalu kecil. Mungkin kata kunci terlalu spesifik atau memang tidak ada peminat.", "cancel"
+    else:
+        return "NETRAL / MODERAT", "blue", \
+               "Ada peluang, tapi tidak terlalu mencolok. Perlu riset lebih dalam pada fitur spesifik.", "info"
+
+def market_decisions(df, by_keyword=True):
+    """get_market_decision per market, side by side.
+
+    One "(semua)" row per market plus, with `by_keyword`, one row per
+    (market, keyword).
+    """
+    rows = []
+    for market, market_df in df.groupby('Pasar', sort=False, observed=True):
+        groups = [("(semua)", market_df)]
+        if by_keyword:
+            groups += list(market_df.groupby('Kata Kunci', sort=False, observed=True))
+        for kw, group in groups:
+            title, color, reason, _ = get_market_decision(group)
+            rows.append({
+                'Pasar': market,
+                'Kata Kunci': kw,
+                'Keputusan': title,
+                'Warna': color,
+                'Alasan': reason,
+                'Total Aplikasi': len(group),
+                'Rating Rata-rata': round(float(group['Rating'].mean()), 2),
+                'Install Rata-rata': round(group['Instalasi'].mean()),
+                'Kompetitor Lemah': int((group['Rating'] < 4.0).sum()),
+            })
+    return pd.DataFrame(rows)
+
+@METRICS.stage('find_opportunities')
+def find_opportunities(df):
+    """Rows worth attacking, one per app, tagged with the kind of gap."""
+    # Opportunities Logic (Relaxed Criteria)
+    opp_df = df[(df['Rating'] < 4.2) & (df['Instalasi'] > 10000)].copy()
+    opp_df['Tipe_Peluang'] = "Kualitas Rendah, Demand Cukup"
+
+    zombie_df = df[df['Zombie App'].fillna(False)].copy()
+    zombie_df['Tipe_Peluang'] = "Zombie App (Lama Tidak Update)"
+
+    low_aso = df[df['Skor ASO'] < 50].copy()
+    low_aso['Tipe_Peluang'] = "ASO Lemah (Mudah Disalip)"
+
+    return pd.concat([opp_df, zombie_df, low_aso]).drop_duplicates(subset=['Pasar', 'App ID'])
+
+def get_competitor_decision(detail, rv_df, trend=None):
+    """Attack/ride/avoid/monitor call; `trend` (competitor_trend) adds real deltas when known."""
+    score = detail.get('score', 0)
+    installs = parse_installs(detail.get('installs', '0'))
+    
+    # Calculate Velocity if available
+    velocity = 0
+    if not rv_df.empty:
+        last_30 = rv_df[rv_df['at'] > datetime.now() - timedelta(days=30)]
+        velocity = len(last_30)
+    
+    if trend and trend['rating_delta'] <= -0.1 and installs > 50000:
+        return "SERANG SEKARANG (Vulnerable)", "success", \
+               f"Rating turun {abs(trend['rating_delta']):.2f} dalam {trend['days']:.0f} hari terakhir (sekarang {score:.1f}) sementara basis user besar ({installs}). Kualitas mereka sedang merosot, ini saat terbaik untuk masuk.", "gavel"
+    elif trend and trend['velocity_now'] > 100 and (trend['velocity_growth'] or 0) >= 0.5:
+        return "TUNGGANGI OMBAK (Viral)", "warning", \
+               f"Review per bulan naik {trend['velocity_growth']:.0%} dalam {trend['days']:.0f} hari ({trend['velocity_now']} review/bulan). Jangan langsung *head-to-head*, tapi buat versi 'alternatif' atau 'lite' untuk mengambil tumpahan user mereka.", "trending_up"
+    elif score < 3.8 and installs > 50000:
+        return "SERANG SEKARANG (Vulnerable)", "success", \
+               f"Musuh sedang lemah! Rating {score:.1f} dengan banyak user ({installs}) artinya user kecewa tapi tidak ada pilihan lain. Masuk dan tawarkan solusi yang lebih stabil.", "gavel"
+    elif velocity > 100:
+        return "TUNGGANGI OMBAK (Viral)", "warning", \
+               f"Kompetitor sedang viral ({velocity} review/bulan). Jangan langsung *head-to-head*, tapi buat versi 'alternatif' atau 'lite' untuk mengambil tumpahan user mereka.", "trending_up"
+    elif score > 4.5 and installs > 1000000:
+        return "HINDARI (Dominant Leader)", "error", \
+               "Raja pasar yang sangat kuat. User puas (Rating 4.5+). Sangat mahal untuk merebut user mereka kecuali Anda punya budget marketing besar.", "shield"
+    else:
+        return "AMATI (Monitor)", "info", \
+               "Kompetitor standar. Cari celah spesifik di fitur yang tidak mereka miliki (lihat tab 'Kelemahan').", "visibility"
+
+def snapshot_metrics(detail, rv_df):
+    """Compact numbers for a watchlist snapshot from one app() detail and its recent reviews."""
+    recent = rv_df[pd.to_datetime(rv_df['at']) > datetime.now() - timedelta(days=30)] if not rv_df.empty else rv_df
+    return {
+        'score': detail.get('score'),
+        'ratings': detail.get('ratings'),
+        'reviews': detail.get('reviews'),
+        'installs': detail.get('realInstalls') or parse_installs(detail.get('installs', '0')),
+        'version': detail.get('version'),
+        'updated': detail.get('updated'),
+        'reviews_30d': len(recent),
+        'avg_score_30d': round(float(recent['score'].mean()), 3) if len(recent) else None,
+        'neg_share_30d': round(float((recent['score'] <= 2).mean()), 3) if len(recent) else None,
+    }
+
+
+def competitor_trend(history, baseline_days=30):
+    """Deltas between the latest snapshot and one about `baseline_days` earlier.
+
+    Uses the newest snapshot at least `baseline_days` older than the latest,
+    or the oldest one when the history is shorter. None until the snapshots
+    span at least a day.
+    """
+    if history is None or len(history) < 2:
+        return None
+    latest = history.iloc[-1]
+    older = history[history['taken_at'] <= latest['taken_at'] - timedelta(days=baseline_days)]
+    base = older.iloc[-1] if not older.empty else history.iloc[0]
+    days = (latest['taken_at'] - base['taken_at']).total_seconds() / 86400
+    if days < 1:
+        return None
+    velocity_now, velocity_prev = latest['reviews_30d'] or 0, base['reviews_30d'] or 0
+    return {
+        'days': round(days, 1),
+        'rating_delta': round(float((latest['score'] or 0) - (base['score'] or 0)), 2),
+        'installs_delta': int((latest['installs'] or 0) - (base['installs'] or 0)),
+        'velocity_now': int(velocity_now),
+        'velocity_delta': int(velocity_now - velocity_prev),
+        'velocity_growth': float((velocity_now - velocity_prev) / velocity_prev) if velocity_prev else None,
+    }
+
+CRITICAL_PERMISSIONS = ['location', 'contacts', 'sms', 'calendar', 'camera', 'microphone']
+
+def sensitive_permissions(detail):
+    perms = detail.get('permissions') or []
+    return [p['permission'] for p in perms if any(k in p['permission'].lower() for k in CRITICAL_PERMISSIONS)]
+
+def complaint_mask(rv_df):
+    """Reviews that complain: 1-2 stars, or text at or below NEGATIVE_POLARITY."""
+    mask = rv_df['score'] <= 2
+    if 'sentiment' in rv_df:
+        mask |= rv_df['sentiment'] <= NEGATIVE_POLARITY
+    return mask
+
+@METRICS.stage('analyze_competitor')
+def analyze_competitor(detail, rv_data, history=None, sentiment_cache=None):
+    """Precompute everything Competitor Spy shows for one app.
+
+    `detail` is an app() result, `rv_data` the list returned by reviews() and
+    `history` the app's watchlist snapshots, if any. Review text is scored
+    with scout.sentiment (cached per reviewId in `sentiment_cache`, a
+    ReviewStore); reviews with 1-2 stars or clearly negative text count as
+    complaints.
+    """
+    rv_df = pd.DataFrame(rv_data)
+    trend = competitor_trend(history)
+
+    spy = {
+        'detail': detail,
+        'reviews': rv_df,
+        'history': history,
+        'trend': trend,
+        'decision': get_competitor_decision(detail, rv_df, trend),
+        'monthly_velocity': 0,
+        'hype_status': "Tidak Diketahui",
+        'daily_sentiment': None,
+        'neg_reviews': rv_df,
+        'pain_points': {},
+        'top_pain_point': "",
+        'top_wish': "Fitur simpel & tanpa iklan",
+        'top_bigrams': [],
+        'complaint_flags': None,
+        'term_freq': Counter(),
+    }
+
+    spy['raised_permissions'] = sensitive_permissions(detail)
+
+    if rv_df.empty:
+        return spy
+
+    rv_df['at'] = pd.to_datetime(rv_df['at'])
+    rv_df['date'] = rv_df['at'].dt.date
+    rv_df['sentiment'] = score_reviews(rv_df, sentiment_cache)
+
+    last_30_days = rv_df[rv_df['at'] > datetime.now() - timedelta(days=30)]
+    spy['monthly_velocity'] = len(last_30_days)
+    spy['hype_status'] = "🔥 VIRAL" if spy['monthly_velocity'] > 50 else "Stabil" if spy['monthly_velocity'] > 10 else "💀 Sepi"
+    spy['daily_sentiment'] = rv_df.groupby('date')[['score', 'sentiment']].mean().reset_index()
+
+    neg_reviews = rv_df[complaint_mask(rv_df)]
+    spy['neg_reviews'] = neg_reviews
+    if neg_reviews.empty:
+        return spy
+
+    text_stats = analyze_texts(neg_reviews['content'])
+    spy['complaint_flags'] = text_stats['flags']
+    spy['term_freq'] = text_stats['terms']
+    spy['top_bigrams'] = text_stats['ngrams'].most_common(5)
+
+    counts = text_stats['flags'].sum()
+    spy['pain_points'] = {cat: int(n) for cat, n in counts.items() if n > 0}
+    if spy['pain_points']:
+        spy['top_pain_point'] = max(spy['pain_points'], key=spy['pain_points'].get)
+
+    wishlist = neg_reviews[neg_reviews['content'].str.contains(WISHLIST_REGEX, case=False, na=False)]
+    if not wishlist.empty:
+        spy['top_wish'] = wishlist['content'].iloc[0][:50]
+
+    return spy
+
+
+@METRICS.stage('compare_competitors')
+def compare_competitors(items, histories=None, sentiment_cache=None):
+    """One comparison row per competitor, audited as a single batch.
+
+    `items` maps app_id to (app() detail, reviews frame); `histories`
+    optionally maps app_id to watchlist snapshots for trend-aware decisions.
+    Complaints (see `complaint_mask`) are found with one sentiment pass and
+    their clusters flagged once over all apps together, then reported as the
+    share of each app's complaints.
+    """
+    histories = histories or {}
+    cutoff = datetime.now() - timedelta(days=30)
+    columns = ['reviewId', 'score', 'content', 'at']
+    frames = [rv[columns].assign(app_id=app_id) for app_id, (_, rv) in items.items() if not rv.empty]
+    reviews = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns + ['app_id'])
+    reviews['at'] = pd.to_datetime(reviews['at'])
+    reviews['sentiment'] = score_reviews(reviews, sentiment_cache)
+    complaints = complaint_mask(reviews)
+    neg = reviews[complaints]
+    shares = complaint_flags(normalize_text(neg['content'])).groupby(neg['app_id']).mean()
+    recent = reviews[reviews['at'] > cutoff].groupby('app_id').size()
+    neg_share = complaints.groupby(reviews['app_id']).mean()
+
+    rows = []
+    for app_id, (detail, rv) in items.items():
+        trend = competitor_trend(histories.get(app_id))
+        title, color, _, _ = get_competitor_decision(detail, rv, trend)
+        row = {
+            'App ID': app_id,
+            'Judul': detail.get('title'),
+            'Rating': detail.get('score'),
+            'Instalasi': detail.get('realInstalls') or parse_installs(detail.get('installs', '0')),
+            'Review 30 Hari': int(recent.get(app_id, 0)),
+            'Review Negatif': float(neg_share.get(app_id, 0.0)),
+            'Keputusan': title,
+            'Status': color,
+            'Keluhan Utama': "",
+            'Izin Sensitif': len(sensitive_permissions(detail)),
+        }
+        if app_id in shares.index and shares.loc[app_id].max() > 0:
+            row['Keluhan Utama'] = shares.loc[app_id].idxmax()
+        for cat in shares.columns:
+            row[cat] = float(shares.loc[app_id, cat]) if app_id in shares.index else 0.0
+        rows.append(row)
+    return pd.DataFrame(rows)
@@ -0,0 +1,93 @@
+"""Chunked export of frames to Parquet, Arrow, gzip CSV and CSV.
+
+Exports consume an iterable of DataFrame chunks and write each chunk as it
+arrives (a Parquet row group, an Arrow record batch, a CSV block), so a
+large market frame or review corpus is never serialized as one big string.
+The app passes `export_bytes` to st.download_button as a callable, so
+nothing is generated until the button is clicked.
+"""
+import gzip
+import io
+
+CHUNK_ROWS = 50000
+
+# label -> (file extension, MIME type)
+FORMATS = {
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+    "Arrow": ("arrow", "application/vnd.apache.arrow.file"),
+    "CSV (gzip)": ("csv.gz", "application/gzip"),
+    "CSV": ("csv", "text/csv"),
+}
+
+
+def format_for_path(path):
+    """Extension-based format: .parquet, .arrow/.feather, .csv.gz, anything else CSV."""
+    if path.endswith(".parquet"):
+        return "parquet"
+    if path.endswith((".arrow", ".feather")):
+        return "arrow"
+    if path.endswith(".csv.gz"):
+        return "csv.gz"
+    return "csv"
+
+
+def frame_chunks(df, chunk_rows=CHUNK_ROWS):
+    for start in range(0, max(len(df), 1), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def write_chunks(chunks, out, fmt):
+    """Write DataFrame chunks to `out` (a path or binary file object) as `fmt`.
+
+    `fmt` is a FORMATS extension. Every chunk must have the columns and
+    dtypes of the first one.
+    """
+    if fmt in ("parquet", "arrow"):
+        _write_arrow(chunks, out, fmt)
+        return
+    sink = open(out, "wb") if isinstance(out, str) else out
+    try:
+        stream = gzip.GzipFile(fileobj=sink, mode="wb", compresslevel=5) if fmt == "csv.gz" else sink
+        text = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+        header = True
+        for chunk in chunks:
+            chunk.to_csv(text, index=False, header=header)
+            header = False
+        text.flush()
+        text.detach()
+        if stream is not sink:
+            stream.close()
+    finally:
+        if sink is not out:
+            sink.close()
+
+
+def _write_arrow(chunks, out, fmt):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Ekspor Parquet/Arrow butuh pyarrow: pip install pyarrow")
+    writer = schema = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                schema = table.schema
+                writer = (pq.ParquetWriter(out, schema, compression="zstd") if fmt == "parquet"
+                          else pa.ipc.new_file(out, schema, options=pa.ipc.IpcWriteOptions(compression="zstd")))
+            writer.write_table(table.cast(schema))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def export_bytes(chunks, fmt):
+    """The whole export as bytes, for st.download_button."""
+    buf = io.BytesIO()
+    write_chunks(chunks, buf, fmt)
+    return buf.getvalue()
+
+
+def export_frame(df, fmt):
+    return export_bytes(frame_chunks(df), fmt)
@@ -0,0 +1,529 @@
+"""Concurrent, rate-limited fetching from the Play Store."""
+import random
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, as_completed, wait
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from scout.core import (MARKET_SCHEMA, build_market_frame, concat_market_frames, market_label, market_record,
+                        normalize_keyword, screen_hit)
+from scout.lazy import lazy_import
+from scout.metrics import METRICS
+
+gps = lazy_import("google_play_scraper")
+gps_exceptions = lazy_import("google_play_scraper.exceptions")
+
+
+class TokenBucket:
+    """Token-bucket rate limiter shared by all fetch workers (thread-safe)."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class FetchEngine:
+    """Bounded worker pool for scraper calls with rate limiting and retry.
+
+    Every call goes through the token bucket and is retried with exponential
+    backoff (plus jitter). Calls that still fail are counted per stage in
+    `failures` and resolve to None instead of raising.
+    """
+
+    def __init__(self, max_workers=8, rate_per_sec=10.0, max_retries=2, backoff=0.5):
+        self.max_workers = max_workers
+        self.limiter = TokenBucket(rate_per_sec)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.failures = Counter()
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def __enter__(self):
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="scout-fetch")
+        return self
+
+    def __exit__(self, *exc):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = None
+
+    def call(self, stage, fn, *args, **kwargs):
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire()
+            started = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+                METRICS.observe('call', stage, time.perf_counter() - started)
+                return result
+            except gps_exceptions.NotFoundError as exc:
+                METRICS.error(stage, exc)
+                break  # app/keyword does not exist, retrying will not help
+            except Exception as exc:
+                METRICS.error(stage, exc)
+                if attempt == self.max_retries:
+                    break
+                time.sleep(self.backoff * (2 ** attempt) * (0.5 + random.random()))
+        with self._lock:
+            self.failures[stage] += 1
+        return None
+
+    def submit(self, stage, fn, *args, **kwargs):
+        return self._pool.submit(self.call, stage, fn, *args, **kwargs)
+
+    def run(self, stage, fn, *args, **kwargs):
+        """Run a composite task on the pool without the token bucket or retry.
+
+        Its own scraper calls go through `call`. An exception is counted as a
+        failure of `stage` and resolves to None, like a failed call.
+        """
+        return self._pool.submit(self._run, stage, fn, *args, **kwargs)
+
+    def _run(self, stage, fn, *args, **kwargs):
+        try:
+            return fn(*args, **kwargs)
+        except Exception as exc:
+            METRICS.error(stage, exc)
+            with self._lock:
+                self.failures[stage] += 1
+            return None
+
+
+def fetch_detail(app_id, country, lang):
+    """One instrumented app() call that raises on failure, for interactive use."""
+    started = time.perf_counter()
+    try:
+        detail = gps.app(app_id, lang=lang, country=country)
+    except Exception as exc:
+        METRICS.error('app', exc)
+        raise
+    METRICS.observe('call', 'app', time.perf_counter() - started)
+    return detail
+
+
+# search() fields that differ between markets sharing one app() detail
+MARKET_FIELDS = ('price', 'currency', 'free')
+
+
+def localize_detail(detail, hit):
+    """`detail` with the market-specific fields of `hit`, a search() result."""
+    local = {f: hit[f] for f in MARKET_FIELDS if hit.get(f) is not None and hit[f] != detail.get(f)}
+    return {**detail, **local} if local else detail
+
+
+class ScanCache:
+    """In-memory LRU of finished per-keyword scan frames, bounded by bytes.
+
+    Entries are keyed by (country, lang, normalized keyword) plus a scan
+    `variant` (hits per search and screening settings), so reordered or
+    overlapping keyword lists reuse earlier results and only the missing
+    keywords are searched. Frames count by their deep memory usage; the
+    least recently used ones are evicted once `max_bytes` is exceeded.
+    Thread-safe, so one instance can serve every Streamlit session.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, ttl=3600):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.nbytes = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, keyword, country, lang, variant=None):
+        key = (country, lang, keyword, variant)
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is not None and entry[0] < time.time():
+                self._drop(key)
+                entry = None
+            if entry is not None:
+                self._items.move_to_end(key)
+        METRICS.cache_event('scan', entry is not None)
+        return entry[2] if entry is not None else None
+
+    def put(self, keyword, country, lang, frame, variant=None):
+        key = (country, lang, keyword, variant)
+        size = int(frame.memory_usage(deep=True).sum())
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._items:
+                self._drop(key)
+            self._items[key] = (time.time() + self.ttl, size, frame)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                self._drop(next(iter(self._items)))
+
+    def _drop(self, key):
+        self.nbytes -= self._items.pop(key)[1]
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.nbytes = 0
+
+    def __len__(self):
+        return len(self._items)
+
+
+def expand_keywords(engine, seeds, markets, depth=1, fan_out=3, graph=None):
+    """Breadth-first suggestions() crawl from `seeds` in every market.
+
+    Each keyword contributes at most `fan_out` new suggestions per level, up
+    to `depth` levels below the seeds. Keywords are normalized and deduped
+    before they are expanded or searched. With a SuggestionGraph `graph`,
+    stored edges are reused and only missing nodes hit the Play Store.
+    Returns {market: {keyword: level}} in discovery order.
+    """
+    expanded = {m: {} for m in markets}
+    for m in markets:
+        for kw in map(normalize_keyword, seeds):
+            if kw:
+                expanded[m].setdefault(kw, 0)
+    # suggestions() only exists in some google_play_scraper releases
+    suggestions = getattr(gps, 'suggestions', None)
+    if not suggestions:
+        return expanded
+
+    frontier = [(m, kw) for m in markets for kw in expanded[m]]
+    for level in range(1, depth + 1):
+        edges = {}
+        futs = {}
+        for node in frontier:
+            (country, lang), kw = node
+            stored = graph.get(kw, country, lang) if graph else None
+            if stored is not None:
+                edges[node] = stored
+            else:
+                futs[engine.submit('suggestions', suggestions, kw, lang=lang, country=country)] = node
+        for fut in as_completed(futs):
+            node = futs[fut]
+            result = fut.result()
+            if result is None:
+                continue
+            edges[node] = [normalize_keyword(s) for s in result]
+            if graph:
+                graph.put(node[1], *node[0], edges[node])
+
+        # Walk the finished level in discovery order so results do not depend on response timing
+        next_frontier = []
+        for node in frontier:
+            market = node[0]
+            new = [s for s in dict.fromkeys(edges.get(node, ())) if s and s not in expanded[market]][:fan_out]
+            for s in new:
+                expanded[market][s] = level
+                next_frontier.append((market, s))
+        frontier = next_frontier
+    return expanded
+
+
+def iter_keyword_data(keywords, country, lang, **kwargs):
+    """Scan keywords in one market; see `iter_market_data` for the batches."""
+    return iter_market_data(keywords, [(country, lang)], **kwargs)
+
+
+def iter_market_data(keywords, markets, max_workers=8, rate_per_sec=10.0, cache=None, depth=1, fan_out=3,
+                     graph=None, scan_cache=None, n_hits=20, screen=None):
+    """Scan keywords in every (country, lang) market on one shared worker pool.
+
+    Keywords are first expanded with `expand_keywords` (`depth=0` disables
+    expansion; `graph` is an optional SuggestionGraph). Yields one batch per
+    (market, keyword) as soon as it is complete: a dict with the market
+    label, keyword, its typed market frame, scan progress and the failure
+    counts so far. Closing the generator cancels pending requests. `cache` is
+    an optional DetailCache consulted before every app() call.
+
+    app() details are fetched once per (appId, lang) and shared by all
+    markets with that language; the market-specific fields (price, currency)
+    come from each market's own search hit.
+
+    With a ScanCache `scan_cache`, keywords scanned before are yielded from
+    it up front and only the rest are searched. Only complete keywords
+    (no failed search or app() call) are stored.
+
+    `screen` (a dict of scout.core.screen_hit thresholds, see
+    SCREEN_DEFAULTS) turns on the two-tier scan: only the `n_hits` search
+    hits that pass the screen get an app() call. The others become rows
+    built from the search() fields alone, with 'Detail' False, which
+    `fetch_row_details` can complete on demand.
+    """
+    if isinstance(keywords, str):
+        keywords = keywords.split(",")
+    markets = list(dict.fromkeys(markets))
+    variant = (n_hits, tuple(sorted(screen.items())) if screen is not None else None)
+
+    with FetchEngine(max_workers=max_workers, rate_per_sec=rate_per_sec) as engine:
+        expanded = expand_keywords(engine, keywords, markets, depth=depth, fan_out=fan_out, graph=graph)
+        total = sum(len(kws) for kws in expanded.values())
+        done = 0
+        missing = []
+        for country, lang in markets:
+            for kw in expanded[(country, lang)]:
+                frame = scan_cache.get(kw, country, lang, variant) if scan_cache is not None else None
+                if frame is None:
+                    missing.append((country, lang, kw))
+                    continue
+                done += 1
+                yield {'market': market_label(country, lang), 'keyword': kw, 'frame': frame,
+                       'done': done, 'total': total, 'failures': dict(engine.failures)}
+
+        # Detail lookups are queued as soon as each search returns, so the
+        # scan takes roughly as long as its slowest chain of requests.
+        search_futs = {engine.submit('search', gps.search, kw, lang=lang, country=country, n_hits=n_hits):
+                       (country, lang, kw) for country, lang, kw in missing}
+        pending = set(search_futs)
+        requested = set()
+        details = {}
+        detail_futs = {}
+        waiting = {}
+        incomplete = set()
+        try:
+            while pending:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    if fut in search_futs:
+                        country, lang, kw = search_futs[fut]
+                        if fut.result() is None:
+                            incomplete.add((country, lang, kw))
+                        hits = [r for r in fut.result() or [] if r.get('appId')]
+                        # Hits that fail the screen never wait for a detail
+                        hits = [(hit, screen is None or _passes(hit, screen)) for hit in hits]
+                        waiting[(country, lang, kw)] = hits
+                        for hit, full in hits:
+                            if not full:
+                                continue
+                            # The same app shows up under related keywords and in other
+                            # markets with the same language; fetch it once per scan
+                            key = (hit['appId'], lang)
+                            if key in requested:
+                                continue
+                            requested.add(key)
+                            cached = cache.get(hit['appId'], country, lang) if cache else None
+                            if cached is not None:
+                                details[key] = cached
+                            else:
+                                detail_fut = engine.submit('app', gps.app, hit['appId'], lang=lang, country=country)
+                                detail_futs[detail_fut] = (key, country)
+                                pending.add(detail_fut)
+                    else:
+                        key, country = detail_futs.pop(fut)
+                        details[key] = fut.result()
+                        if cache and details[key] is not None:
+                            cache.put(key[0], country, key[1], details[key])
+
+                ready = [k for k, hits in waiting.items()
+                         if all((h['appId'], k[1]) in details for h, full in hits if full)]
+                for country, lang, kw in ready:
+                    records = []
+                    complete = (country, lang, kw) not in incomplete
+                    for hit, full in waiting.pop((country, lang, kw)):
+                        detail = details[(hit['appId'], lang)] if full else hit
+                        if detail is None:
+                            complete = False
+                            continue
+                        try:
+                            records.append(market_record(kw, localize_detail(detail, hit) if full else hit, full))
+                        except Exception:
+                            engine.failures['parse'] += 1
+                    done += 1
+                    market = market_label(country, lang)
+                    frame = build_market_frame(records, market)
+                    if scan_cache is not None and complete:
+                        scan_cache.put(kw, country, lang, frame, variant)
+                    METRICS.add_rows('scan', len(records))
+                    yield {'market': market, 'keyword': kw, 'frame': frame,
+                           'done': done, 'total': total, 'failures': dict(engine.failures)}
+        finally:
+            if cache:
+                cache.prune()
+            if graph:
+                graph.prune()
+
+
+def _passes(hit, screen):
+    try:
+        return screen_hit(hit, **screen)
+    except Exception:
+        # Malformed hit: let the app() detail decide
+        return True
+
+
+def fetch_row_details(df, rows, cache=None, max_workers=8, rate_per_sec=10.0):
+    """Complete screened rows of a market frame with their app() details.
+
+    `rows` are index labels of `df`. Each row is rebuilt from a detail
+    fetched in its own market (DetailCache `cache` first). Returns the new
+    frame and the failure counts; rows whose fetch failed stay screened.
+    """
+    rows = [r for r in rows if not df.at[r, 'Detail']]
+    if not rows:
+        return df, {}
+    with FetchEngine(max_workers=max_workers, rate_per_sec=rate_per_sec) as engine:
+        futs = {}
+        details = {}
+        for r in rows:
+            app_id = df.at[r, 'App ID']
+            country, lang = str(df.at[r, 'Pasar']).split("/")
+            key = (app_id, country, lang)
+            if key in details or key in futs.values():
+                continue
+            cached = cache.get(*key) if cache else None
+            if cached is not None:
+                details[key] = cached
+            else:
+                futs[engine.submit('app', gps.app, app_id, lang=lang, country=country)] = key
+        for fut in as_completed(futs):
+            key = futs[fut]
+            details[key] = fut.result()
+            if cache and details[key] is not None:
+                cache.put(*key, details[key])
+        failures = dict(engine.failures)
+
+    done = []
+    frames = []
+    for r in rows:
+        market = str(df.at[r, 'Pasar'])
+        detail = details.get((df.at[r, 'App ID'], *market.split("/")))
+        if detail is None:
+            continue
+        frames.append(build_market_frame([market_record(df.at[r, 'Kata Kunci'], detail)], market).set_axis([r]))
+        done.append(r)
+    if not done:
+        return df, failures
+    out = pd.concat([df.drop(index=done)] + frames).sort_index()
+    return out.astype({col: dtype for col, dtype in MARKET_SCHEMA.items() if col in out.columns}), failures
+
+
+def scan_keywords(keywords, country, lang, **kwargs):
+    """Run a full scan and return (market frame, failure counts)."""
+    frames = []
+    failures = {}
+    for batch in iter_keyword_data(keywords, country, lang, **kwargs):
+        frames.append(batch['frame'])
+        failures = batch['failures']
+    return concat_market_frames(frames), failures
+
+
+def fetch_competitor(store, app_id, country, lang, engine, window_days=30, max_reviews=10000):
+    """app() detail plus the stored reviews of the window after a sync; None if app() fails."""
+    detail = engine.call('app', gps.app, app_id, lang=lang, country=country)
+    if detail is None:
+        return None
+    sync_reviews(store, app_id, country, lang, window_days=window_days, max_reviews=max_reviews, engine=engine)
+    return detail, store.load(app_id, country, lang, since=datetime.now() - timedelta(days=window_days))
+
+
+def fetch_competitors(store, app_ids, country, lang, window_days=30, max_reviews=10000, max_workers=8,
+                      rate_per_sec=10.0):
+    """fetch_competitor for many apps at once, one app per worker.
+
+    Returns ({app_id: (detail, reviews)}, failure counts); apps whose app()
+    call failed are left out.
+    """
+    app_ids = list(dict.fromkeys(app_ids))
+    with METRICS.timed('fetch_competitors'), FetchEngine(max_workers=max_workers, rate_per_sec=rate_per_sec) as engine:
+        futs = {app_id: engine.run('competitor', fetch_competitor, store, app_id, country, lang, engine=engine,
+                                   window_days=window_days, max_reviews=max_reviews)
+                for app_id in app_ids}
+        results = {app_id: fut.result() for app_id, fut in futs.items()}
+        return {app_id: r for app_id, r in results.items() if r is not None}, dict(engine.failures)
+
+
+REVIEW_PAGE_SIZE = 200
+
+
+def sync_reviews(store, app_id, country, lang, window_days=30, max_reviews=10000, engine=None):
+    """Bring the stored review history of one app up to date.
+
+    Pages newest-first through reviews() with its continuation_token. Paging
+    stops at the start of the time window, after `max_reviews` reviews
+    outside the stored range, or at the end of the feed. The stored range is
+    the span from `newest_at` down to `oldest_at` known to be stored without
+    gaps; paging also stops where it joins that range if the range already
+    reaches the window start, and otherwise pages on through it to fill in
+    older history. Returns the number of new reviews stored.
+    """
+    with METRICS.timed('sync_reviews'):
+        added = _sync_reviews(store, app_id, country, lang, window_days, max_reviews,
+                              engine or FetchEngine(rate_per_sec=0))
+    METRICS.add_rows('reviews_new', added)
+    return added
+
+
+def _sync_reviews(store, app_id, country, lang, window_days, max_reviews, engine):
+    cutoff = (datetime.now() - timedelta(days=window_days)).timestamp()
+    state = store.sync_state(app_id, country, lang)
+    newest = state['newest_at'] if state else None
+    oldest = state['oldest_at'] if state else None
+    # A stored range that already reaches the window start ends paging where it joins
+    covered = state is not None and (state['exhausted'] or (oldest is not None and oldest <= cutoff))
+
+    token = None
+    fetched = added = 0
+    # The span paged this time; it is gap-free from the newest review down
+    block_newest = block_oldest = None
+    failed = joined = exhausted = False
+    while fetched < max_reviews:
+        if token is None:
+            result = engine.call('reviews', gps.reviews, app_id, lang=lang, country=country,
+                                 sort=gps.Sort.NEWEST, count=REVIEW_PAGE_SIZE)
+        else:
+            result = engine.call('reviews', gps.reviews, app_id, continuation_token=token)
+        if result is None:
+            failed = True
+            break
+        page, token = result
+        if not page:
+            exhausted = True
+            break
+        added += store.add(app_id, country, lang, page)
+
+        times = [r['at'].timestamp() for r in page]
+        # Re-paging through the stored range does not count against max_reviews
+        fetched += len(times) if newest is None else sum(not oldest <= t <= newest for t in times)
+        block_newest = max(times) if block_newest is None else block_newest
+        block_oldest = min(times)
+        if newest is not None and block_oldest <= newest:
+            joined = True
+            if covered:
+                break
+        if block_oldest < cutoff:
+            break
+        if token is None or token.token is None:
+            exhausted = True
+            break
+
+    if joined:
+        # Contiguous with the stored range: merge the two
+        if block_oldest < oldest:
+            store.mark_synced(app_id, country, lang, max(block_newest, newest), block_oldest, exhausted)
+        else:
+            store.mark_synced(app_id, country, lang, max(block_newest, newest), oldest,
+                              state['exhausted'] or exhausted)
+    elif block_newest is not None and not (failed and state):
+        # A gap may remain below this block; track the block alone. After a
+        # failed page the old range is kept instead, so the next sync pages
+        # down to it again and fills the gap.
+        store.mark_synced(app_id, country, lang, block_newest, block_oldest, exhausted)
+    elif exhausted and state is None:
+        store.mark_synced(app_id, country, lang, None, None, True)
+    return added
@@ -0,0 +1,82 @@
+"""Deferred imports of heavy libraries, with an import-time report.
+
+`lazy_import("plotly.express")` returns a stand-in that imports the real
+module on first attribute access and records how long that took. Together
+with the startup time recorded by the app this gives a cold-start report,
+and `python -m scout imports --budget-ms N` measures the eager import set in
+a fresh interpreter and fails when it goes over budget.
+"""
+import importlib
+import os
+import subprocess
+import sys
+import threading
+import time
+
+# Modules app.py imports eagerly; keep in sync with its import block.
+STARTUP_MODULES = ("streamlit", "pandas", "scout.core", "scout.export", "scout.fetch", "scout.render", "scout.reviews",
+                   "scout.store", "scout.watch")
+# Modules that are only imported when the code path that needs them runs.
+DEFERRED_MODULES = ("google_play_scraper", "plotly.express", "wordcloud")
+
+DEFAULT_BUDGET_MS = 1500.0
+
+IMPORT_TIMES = {}
+_lock = threading.Lock()
+
+
+def import_budget_ms():
+    return float(os.environ.get("APP_SCOUT_IMPORT_BUDGET_MS", DEFAULT_BUDGET_MS))
+
+
+def record_import(name, seconds):
+    """Keep the first (cold) timing per name; later reruns import from cache."""
+    with _lock:
+        IMPORT_TIMES.setdefault(name, seconds)
+
+
+def timed_import(name):
+    if name in sys.modules:
+        return sys.modules[name]
+    started = time.perf_counter()
+    module = importlib.import_module(name)
+    record_import(name, time.perf_counter() - started)
+    return module
+
+
+class LazyModule:
+    """Module stand-in that imports `name` on first attribute access."""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = timed_import(self._name)
+        return getattr(self._module, attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_import(name):
+    return LazyModule(name)
+
+
+def import_report():
+    """Recorded import timings in ms, slowest first."""
+    with _lock:
+        items = sorted(IMPORT_TIMES.items(), key=lambda kv: kv[1], reverse=True)
+    return [{'module': name, 'ms': round(seconds * 1000, 1)} for name, seconds in items]
+
+
+def measure_cold_import(modules):
+    """Import `modules` in a fresh interpreter and return the time in ms."""
+    code = ("import time; t = time.perf_counter()\n"
+            + "".join(f"import {m}\n" for m in modules)
+            + "print((time.perf_counter() - t) * 1000)")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
@@ -0,0 +1,166 @@
+"""Process-wide instrumentation for scraper calls and analysis stages.
+
+`METRICS` records latency histograms per scraper call and per analysis stage,
+error counts by exception type, cache hits/misses and rows produced. It can
+be exported as JSON or Prometheus text exposition format.
+"""
+import functools
+import json
+import math
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+# Upper bounds in seconds; the last bucket catches everything.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, math.inf)
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th observation."""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= target:
+                return bound
+        return self.buckets[-1]
+
+
+class Metrics:
+    """Thread-safe registry; kinds are 'call' (scraper) and 'stage' (analysis)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.latency = {}
+            self.errors = Counter()
+            self.cache = Counter()
+            self.rows = Counter()
+            self.started = time.time()
+
+    def observe(self, kind, name, seconds):
+        with self._lock:
+            self.latency.setdefault((kind, name), Histogram()).observe(seconds)
+
+    def error(self, name, exc):
+        with self._lock:
+            self.errors[(name, type(exc).__name__)] += 1
+
+    def cache_event(self, name, hit):
+        with self._lock:
+            self.cache[(name, "hit" if hit else "miss")] += 1
+
+    def add_rows(self, name, n):
+        with self._lock:
+            self.rows[name] += n
+
+    @contextmanager
+    def timed(self, name, kind="stage"):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(kind, name, time.perf_counter() - started)
+
+    def stage(self, name):
+        """Decorator form of `timed` for whole functions."""
+        def decorate(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.timed(name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def snapshot(self):
+        with self._lock:
+            latency = [{
+                'kind': kind,
+                'name': name,
+                'count': h.count,
+                'mean_ms': round(h.sum / h.count * 1000, 2) if h.count else None,
+                'p50_ms': _ms(h.quantile(0.5)),
+                'p95_ms': _ms(h.quantile(0.95)),
+                'buckets': {_le(b): n for b, n in zip(h.buckets, h.counts)},
+            } for (kind, name), h in sorted(self.latency.items())]
+            caches = {}
+            for (name, result), n in self.cache.items():
+                caches.setdefault(name, {'hit': 0, 'miss': 0})[result] = n
+            for stats in caches.values():
+                total = stats['hit'] + stats['miss']
+                stats['hit_ratio'] = round(stats['hit'] / total, 4) if total else None
+            return {
+                'since': self.started,
+                'latency': latency,
+                'errors': [{'name': name, 'type': etype, 'count': n} for (name, etype), n in sorted(self.errors.items())],
+                'cache': caches,
+                'rows': dict(self.rows),
+            }
+
+    def to_json(self, **extra):
+        return json.dumps({**self.snapshot(), **extra}, indent=2)
+
+    def to_prometheus(self):
+        lines = []
+        with self._lock:
+            for kind in ("call", "stage"):
+                metric = f"app_scout_{kind}_duration_seconds"
+                series = [(name, h) for (k, name), h in sorted(self.latency.items()) if k == kind]
+                if not series:
+                    continue
+                lines += [f"# HELP {metric} Latency of {'Play Store scraper calls' if kind == 'call' else 'analysis stages'}.",
+                          f"# TYPE {metric} histogram"]
+                for name, h in series:
+                    cumulative = 0
+                    for bound, n in zip(h.buckets, h.counts):
+                        cumulative += n
+                        lines.append(f'{metric}_bucket{{{kind}="{name}",le="{_le(bound)}"}} {cumulative}')
+                    lines.append(f'{metric}_sum{{{kind}="{name}"}} {h.sum:.6f}')
+                    lines.append(f'{metric}_count{{{kind}="{name}"}} {h.count}')
+            counters = (
+                ("app_scout_errors_total", "Failed scraper call attempts by exception type.",
+                 [(f'call="{name}",type="{etype}"', n) for (name, etype), n in sorted(self.errors.items())]),
+                ("app_scout_cache_requests_total", "Cache lookups by result.",
+                 [(f'cache="{name}",result="{result}"', n) for (name, result), n in sorted(self.cache.items())]),
+                ("app_scout_rows_total", "Rows produced.",
+                 [(f'source="{name}"', n) for name, n in sorted(self.rows.items())]),
+            )
+            for metric, help_text, samples in counters:
+                if samples:
+                    lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+                    lines += [f"{metric}{{{labels}}} {n}" for labels, n in samples]
+        return "\n".join(lines) + "\n"
+
+
+def _le(bound):
+    return "+Inf" if bound == math.inf else repr(bound)
+
+
+def _ms(seconds):
+    if seconds is None:
+        return None
+    return None if seconds == math.inf else round(seconds * 1000, 1)
+
+
+METRICS = Metrics()
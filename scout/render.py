@@ -0,0 +1,163 @@
+"""Chart and word-cloud builders behind a bounded render cache.
+
+Every builder fingerprints exactly the data and parameters it draws, and
+returns the figure (or PNG bytes) built the last time it saw the same
+fingerprint. Reruns that only change unrelated widgets therefore reuse
+ready-made figures. No matplotlib figures are created, so nothing has to be
+closed; word clouds are rendered straight to PNG from term frequencies.
+"""
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from scout.lazy import lazy_import
+from scout.metrics import METRICS
+
+px = lazy_import("plotly.express")
+wordcloud = lazy_import("wordcloud")
+
+
+class RenderCache:
+    """Thread-safe LRU of rendered objects keyed by fingerprint."""
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, kind, key, build):
+        with self._lock:
+            hit = key in self._items
+            if hit:
+                self._items.move_to_end(key)
+                value = self._items[key]
+        METRICS.cache_event('render', hit)
+        if hit:
+            return value
+        with METRICS.timed(f"render.{kind}"):
+            value = build()
+        with self._lock:
+            self._items[key] = value
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+
+RENDER_CACHE = RenderCache()
+
+
+def fingerprint(*parts):
+    """Digest of frames (by content, via hash_pandas_object) and plain values (by repr)."""
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if isinstance(part, (pd.DataFrame, pd.Series)):
+            h.update(repr(list(part.columns) if isinstance(part, pd.DataFrame) else part.name).encode())
+            h.update(pd.util.hash_pandas_object(part, index=False).values.tobytes())
+        else:
+            h.update(repr(part).encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _cached(kind, build, *parts):
+    return RENDER_CACHE.get_or_build(kind, fingerprint(kind, *parts), build)
+
+
+def market_scatter(df, height=400, size="Review", cached=True):
+    """Installs vs rating per app. Pass cached=False for one-off figures, such
+    as the ones redrawn after every batch of a running scan."""
+    cols = ['Instalasi', 'Rating', 'Skor ASO', 'Judul'] + ([size] if size else [])
+    data = df[cols]
+
+    def build():
+        if not size or data[size].notna().all():
+            return px.scatter(data, x="Instalasi", y="Rating", color="Skor ASO", size=size, hover_name="Judul",
+                              color_continuous_scale="RdYlGn", height=height)
+        # Apps without details (unknown size) are drawn as the smallest bubbles
+        known = data[size].astype(float)
+        marker = known.fillna(known.min() if known.notna().any() else 1.0)
+        return px.scatter(data.assign(_size=marker), x="Instalasi", y="Rating", color="Skor ASO", size="_size",
+                          hover_name="Judul", hover_data={'_size': False, size: True},
+                          color_continuous_scale="RdYlGn", height=height)
+    if not cached:
+        return build()
+    return _cached("market_scatter", build, data, height, size)
+
+
+def lite_scatter(df, height=400):
+    data = df[['Ukuran (MB)', 'Instalasi', 'Rating', 'Judul']].dropna(subset=['Ukuran (MB)'])
+    return _cached("lite_scatter", lambda: px.scatter(
+        data, x="Ukuran (MB)", y="Instalasi", color="Rating", hover_name="Judul", height=height), data, height)
+
+
+def sentiment_trend(daily):
+    """Daily text sentiment (-1..1) and average star rating, one panel each."""
+    def build():
+        long = daily.rename(columns={'sentiment': 'Sentimen Teks', 'score': 'Rating Bintang'}).melt(
+            id_vars='date', var_name='metrik', value_name='nilai')
+        fig = px.line(long, x='date', y='nilai', facet_row='metrik', title="Tren Sentimen (Memburuk/Membaik?)",
+                      markers=True, height=320)
+        fig.update_yaxes(matches=None)
+        fig.for_each_annotation(lambda a: a.update(text=a.text.split("=")[-1]))
+        fig.update_layout(margin=dict(l=20, r=20, t=40, b=20), showlegend=False)
+        return fig
+    return _cached("sentiment_trend", build, daily)
+
+
+def rating_pie(scores):
+    counts = scores.value_counts().rename_axis('score').reset_index(name='count')
+
+    def build():
+        fig = px.pie(counts, names='score', values='count', title="Komposisi Rating", height=450, hole=0.5)
+        fig.update_layout(legend=dict(orientation="h", y=-0.1, x=0.5, xanchor="center", yanchor="top"))
+        return fig
+    return _cached("rating_pie", build, counts)
+
+
+def complaint_cloud(term_freq, width=400, height=300, max_words=200):
+    """PNG bytes of a word cloud over precomputed term counts, or None if empty.
+
+    Drops the same words WordCloud.generate() would: its stopword list and
+    bare numbers.
+    """
+    stopwords = wordcloud.STOPWORDS
+    top = []
+    for term, n in term_freq.most_common():
+        if term not in stopwords and not term.isdigit():
+            top.append((term, n))
+            if len(top) == max_words:
+                break
+    if not top:
+        return None
+
+    def build():
+        wc = wordcloud.WordCloud(width=width, height=height, background_color='white', colormap='Reds',
+                                 max_words=max_words).generate_from_frequencies(dict(top))
+        buf = io.BytesIO()
+        wc.to_image().save(buf, format="PNG")
+        return buf.getvalue()
+    return _cached("complaint_cloud", build, top, width, height)
+
+
+def watch_history(history):
+    """Rating and 30-day review count over the watchlist snapshots."""
+    data = history[['taken_at', 'score', 'reviews_30d']]
+
+    def build():
+        long = data.melt(id_vars='taken_at', var_name='metrik', value_name='nilai')
+        fig = px.line(long, x='taken_at', y='nilai', facet_row='metrik', markers=True, height=350,
+                      title="Riwayat Pantauan")
+        fig.update_yaxes(matches=None)
+        fig.update_layout(margin=dict(l=20, r=20, t=40, b=20), showlegend=False)
+        return fig
+    return _cached("watch_history", build, data)
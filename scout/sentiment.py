@@ -0,0 +1,164 @@
+"""Lexicon-based sentiment of review text, Indonesian and English.
+
+Every review gets a polarity in [-1, 1]: the lexicon weights of its words
+are summed (a word right after a negator such as "tidak" or "not" counts
+with the opposite sign) and squashed with s / sqrt(s^2 + 15), as in VADER.
+Reviews without lexicon words score 0. Scoring is one vectorized pass over
+the exploded tokens (about 50k reviews/second on one core, dominated by
+tokenization).
+Corpora of POOL_MIN_REVIEWS or more are split across a process pool, and
+`score_reviews` caches results per reviewId so every review is scored once.
+
+Bump SENTIMENT_VERSION whenever the lexicon or the formula changes; cached
+scores of older versions are then recomputed.
+"""
+import math
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+
+import numpy as np
+import pandas as pd
+
+from scout.metrics import METRICS
+from scout.reviews import TOKEN_REGEX, normalize_text
+
+SENTIMENT_VERSION = 2
+# Text polarity at or below which a review counts as a complaint whatever its stars
+NEGATIVE_POLARITY = -0.3
+POOL_MIN_REVIEWS = 50000
+POOL_CHUNK = 25000
+ALPHA = 15
+
+_POSITIVE = {
+    2: ["mantap", "mantul", "keren", "hebat", "sempurna", "terbaik", "luar biasa", "recommended", "rekomendasi",
+        "excellent", "amazing", "awesome", "perfect", "best", "love", "fantastic", "wonderful", "great",
+        "suka", "senang", "puas", "top"],
+    1: ["bagus", "baik", "membantu", "bermanfaat", "berguna", "mudah", "gampang", "lancar", "cepat", "ringan",
+        "praktis", "nyaman", "rapi", "menarik", "akurat", "lengkap", "oke", "ok", "sip", "terima kasih", "makasih",
+        "good", "nice", "helpful", "useful", "easy", "simple", "fast", "smooth", "cool", "like", "thanks",
+        "works", "accurate", "enjoy", "recommend", "stable", "worth"],
+}
+_NEGATIVE = {
+    2: ["jelek", "buruk", "parah", "kecewa", "mengecewakan", "sampah", "payah", "penipu", "penipuan", "tipu",
+        "benci", "hancur", "rusak", "uninstall", "hapus", "terrible", "horrible", "awful", "worst", "useless",
+        "scam", "hate", "garbage", "trash", "disappointed", "disappointing", "broken", "waste"],
+    1: ["lambat", "lemot", "lag", "macet", "error", "eror", "crash", "bug", "ribet", "sulit", "susah", "bingung",
+        "mahal", "ganggu", "mengganggu", "iklan", "kurang", "gagal", "hilang", "boros", "lelet", "force close",
+        "bad", "slow", "poor", "annoying", "ads", "expensive", "fail", "failed", "problem", "issue", "freeze",
+        "stuck", "wrong", "difficult", "confusing", "laggy", "glitch", "fix"],
+}
+NEGATORS = frozenset([
+    "tidak", "tak", "gak", "ga", "nggak", "ngga", "enggak", "engga", "ndak", "bukan", "belum", "jangan", "tdk",
+    "gk", "kagak", "not", "no", "never", "cannot", "t", "dont", "doesnt", "didnt", "isnt", "wasnt", "cant",
+    "wont", "without", "kurang",
+])
+
+
+def _build_lexicon():
+    words = {}
+    for sign, groups in ((1, _POSITIVE), (-1, _NEGATIVE)):
+        for weight, terms in groups.items():
+            for term in terms:
+                words[term] = sign * weight
+    return words
+
+
+LEXICON = _build_lexicon()
+# Multi-word entries ("luar biasa", "force close") are matched as joined tokens
+_PHRASES = {tuple(k.split()): v for k, v in LEXICON.items() if " " in k}
+
+
+def score_texts(texts):
+    """Polarity in [-1, 1] for each text in `texts` (a list or Series), as a numpy array."""
+    texts = pd.Series(list(texts) if not isinstance(texts, pd.Series) else texts.to_numpy(), dtype=object)
+    if texts.empty:
+        return np.zeros(0)
+    tokens = normalize_text(texts).str.findall(TOKEN_REGEX).explode().dropna()
+    if tokens.empty:
+        return np.zeros(len(texts))
+    doc = tokens.index.to_numpy()
+    # Look words up once per distinct word, not once per token
+    codes, uniques = pd.factorize(tokens.to_numpy())
+    weights = np.array([LEXICON.get(w, 0.0) for w in uniques], dtype=float)[codes]
+    is_negator = np.array([w in NEGATORS for w in uniques], dtype=bool)[codes]
+    prev_same = np.r_[False, doc[1:] == doc[:-1]]
+    lookup = {w: i for i, w in enumerate(uniques)}
+    for (first, second), weight in _PHRASES.items():
+        if first not in lookup or second not in lookup:
+            continue
+        hit = prev_same & np.r_[False, codes[:-1] == lookup[first]] & (codes == lookup[second])
+        # The phrase counts once, on its first word, so a negator before it applies
+        weights[np.r_[hit[1:], False]] = weight
+        weights[hit] = 0.0
+    negated = prev_same & np.r_[False, is_negator[:-1]]
+    weights = np.where(negated, -weights, weights)
+    total = np.bincount(doc, weights=weights, minlength=len(texts))
+    return total / np.sqrt(total * total + ALPHA)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers):
+    # spawn, not fork: the Streamlit server is multi-threaded
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"))
+        return _pool
+
+
+def _reset_pool(broken):
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def pool_workers():
+    return min(4, os.cpu_count() or 1)
+
+
+def score_batch(texts, workers=None):
+    """`score_texts` for a whole corpus, spread over processes when it is large."""
+    texts = list(texts)
+    workers = pool_workers() if workers is None else workers
+    if len(texts) < POOL_MIN_REVIEWS or workers < 2:
+        return score_texts(texts)
+    chunk = max(POOL_CHUNK, math.ceil(len(texts) / workers))
+    parts = [texts[i:i + chunk] for i in range(0, len(texts), chunk)]
+    pool = _get_pool(workers)
+    try:
+        return np.concatenate(list(pool.map(score_texts, parts)))
+    except BrokenProcessPool as exc:
+        # A worker died (OOM, kill): drop the pool so the next batch starts a new one
+        METRICS.error('sentiment', exc)
+        _reset_pool(pool)
+        return score_texts(texts)
+
+
+@METRICS.stage('sentiment')
+def score_reviews(rv_df, cache=None, workers=None):
+    """Text polarity per row of a reviews frame, as a float Series aligned with it.
+
+    With a ReviewStore `cache`, stored scores are looked up by reviewId and
+    only the reviews scored for the first time are computed (and stored).
+    """
+    if rv_df.empty:
+        return pd.Series(dtype=float, index=rv_df.index)
+    ids = rv_df['reviewId'].astype(str) if 'reviewId' in rv_df else None
+    known = cache.sentiment(ids.unique(), SENTIMENT_VERSION) if cache is not None and ids is not None else {}
+    polarity = ids.map(known).astype(float) if known else pd.Series(np.nan, index=rv_df.index)
+    todo = polarity.isna()
+    METRICS.cache_event('sentiment', not todo.any())
+    if todo.any():
+        fresh = score_batch(rv_df.loc[todo, 'content'].fillna("").astype(str), workers)
+        polarity[todo] = fresh
+        if cache is not None and ids is not None:
+            cache.put_sentiment(zip(ids[todo], fresh.tolist()), SENTIMENT_VERSION)
+    return polarity.rename('sentiment')
@@ -0,0 +1,489 @@
+"""Persistent local stores backed by SQLite."""
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from scout.metrics import METRICS
+
+DEFAULT_DB_PATH = "app_scout_cache.sqlite"
+
+
+def default_db_path():
+    return os.environ.get("APP_SCOUT_CACHE_DB", DEFAULT_DB_PATH)
+
+
+class SQLiteStore:
+    """Base for stores sharing one SQLite file in WAL mode.
+
+    Each thread gets its own connection; subclasses list their DDL in SCHEMA.
+    """
+
+    SCHEMA = ()
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._conn() as conn:
+            for ddl in self.SCHEMA:
+                conn.execute(ddl)
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+
+class DetailCache(SQLiteStore):
+    """Persistent app() detail store keyed by (appId, country, lang).
+
+    Backed by SQLite in WAL mode so it survives restarts and can be shared by
+    several Streamlit workers on the same host. Entries carry their own expiry
+    and the table is trimmed to `max_entries`, least recently used first.
+    """
+
+    SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS app_details (
+            app_id TEXT NOT NULL,
+            country TEXT NOT NULL,
+            lang TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            fetched_at REAL NOT NULL,
+            expires_at REAL NOT NULL,
+            last_access REAL NOT NULL,
+            PRIMARY KEY (app_id, country, lang)
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_app_details_access ON app_details (last_access)",
+    )
+
+    def __init__(self, path, ttl=24 * 3600, max_entries=50000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        super().__init__(path)
+
+    def get(self, app_id, country, lang):
+        now = time.time()
+        with self._conn() as conn:
+            row = conn.execute(
+                "SELECT payload FROM app_details WHERE app_id=? AND country=? AND lang=? AND expires_at>?",
+                (app_id, country, lang, now)).fetchone()
+            METRICS.cache_event('app_details', hit=row is not None)
+            if row is None:
+                return None
+            conn.execute("UPDATE app_details SET last_access=? WHERE app_id=? AND country=? AND lang=?",
+                         (now, app_id, country, lang))
+        return json.loads(row[0])
+
+    def put(self, app_id, country, lang, detail, ttl=None):
+        now = time.time()
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO app_details VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (app_id, country, lang, json.dumps(detail, default=str), now, now + (ttl or self.ttl), now))
+
+    def prune(self):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM app_details WHERE expires_at<=?", (time.time(),))
+            conn.execute("""
+                DELETE FROM app_details WHERE rowid IN (
+                    SELECT rowid FROM app_details ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                )""", (self.max_entries,))
+
+
+class SuggestionGraph(SQLiteStore):
+    """Keyword expansion graph: the suggestions() edges of each keyword.
+
+    Stored per (keyword, country, lang) with the full suggestion list, so
+    expansions with a different depth or fan-out reuse the same nodes.
+    Keywords are stored normalized (see scout.core.normalize_keyword).
+    """
+
+    SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS keyword_suggestions (
+            keyword TEXT NOT NULL,
+            country TEXT NOT NULL,
+            lang TEXT NOT NULL,
+            suggestions TEXT NOT NULL,
+            fetched_at REAL NOT NULL,
+            expires_at REAL NOT NULL,
+            PRIMARY KEY (keyword, country, lang)
+        )""",
+    )
+
+    def __init__(self, path, ttl=7 * 24 * 3600):
+        self.ttl = ttl
+        super().__init__(path)
+
+    def get(self, keyword, country, lang):
+        row = self._conn().execute(
+            "SELECT suggestions FROM keyword_suggestions WHERE keyword=? AND country=? AND lang=? AND expires_at>?",
+            (keyword, country, lang, time.time())).fetchone()
+        METRICS.cache_event('suggestions', hit=row is not None)
+        return None if row is None else json.loads(row[0])
+
+    def put(self, keyword, country, lang, suggestions):
+        now = time.time()
+        with self._conn() as conn:
+            conn.execute("INSERT OR REPLACE INTO keyword_suggestions VALUES (?, ?, ?, ?, ?, ?)",
+                         (keyword, country, lang, json.dumps(suggestions), now, now + self.ttl))
+
+    def prune(self):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM keyword_suggestions WHERE expires_at<=?", (time.time(),))
+
+
+def fts_query(text):
+    """FTS5 MATCH expression for user input: "quoted phrases" and bare terms, all required.
+
+    Every term is quoted, so FTS operators typed by the user are matched as
+    plain words instead of raising syntax errors. Bare terms are prefix
+    queries, so "iklan" also finds "iklannya"; quoted phrases match whole
+    words. Returns None for empty input.
+    """
+    parts = []
+    for phrase, term in re.findall(r'"([^"]*)"|(\S+)', text):
+        words = re.findall(r"\w+", phrase or term)
+        if words:
+            parts.append('"' + " ".join(words) + '"' + ("" if phrase else "*"))
+    return " AND ".join(parts) or None
+
+
+class ReviewStore(SQLiteStore):
+    """Local review history per (appId, country, lang).
+
+    Each reviewId is stored once. `review_sync` remembers the newest span
+    of history that is stored without gaps and whether it reaches the end of
+    the Play Store feed, so later syncs only need to fetch what is newer
+    (see scout.fetch.sync_reviews).
+    Review text is indexed in an FTS5 table kept up to date by a trigger as
+    reviews are added, so `search` never scans the text itself. Text
+    sentiment is cached per reviewId in `review_sentiment`.
+    """
+
+    COLUMNS = ['reviewId', 'userName', 'content', 'score', 'thumbsUpCount', 'appVersion',
+               'at', 'replyContent', 'repliedAt']
+
+    SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS reviews (
+            app_id TEXT NOT NULL,
+            country TEXT NOT NULL,
+            lang TEXT NOT NULL,
+            review_id TEXT NOT NULL,
+            user_name TEXT,
+            content TEXT,
+            score INTEGER,
+            thumbs_up INTEGER,
+            app_version TEXT,
+            at REAL NOT NULL,
+            reply_content TEXT,
+            replied_at REAL,
+            PRIMARY KEY (app_id, country, lang, review_id)
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_reviews_at ON reviews (app_id, country, lang, at)",
+        """CREATE TABLE IF NOT EXISTS review_sync (
+            app_id TEXT NOT NULL,
+            country TEXT NOT NULL,
+            lang TEXT NOT NULL,
+            synced_at REAL NOT NULL,
+            newest_at REAL,
+            oldest_at REAL,
+            exhausted INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (app_id, country, lang)
+        )""",
+        """CREATE VIRTUAL TABLE IF NOT EXISTS reviews_fts USING fts5(
+            content, content='reviews', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2'
+        )""",
+        """CREATE TRIGGER IF NOT EXISTS reviews_fts_insert AFTER INSERT ON reviews BEGIN
+            INSERT INTO reviews_fts (rowid, content) VALUES (new.rowid, new.content);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS reviews_fts_delete AFTER DELETE ON reviews BEGIN
+            INSERT INTO reviews_fts (reviews_fts, rowid, content) VALUES ('delete', old.rowid, old.content);
+        END""",
+        """CREATE TABLE IF NOT EXISTS review_sentiment (
+            review_id TEXT PRIMARY KEY,
+            version INTEGER NOT NULL,
+            polarity REAL NOT NULL
+        )""",
+    )
+
+    def __init__(self, path):
+        super().__init__(path)
+        with self._conn() as conn:
+            # Stores created before the index existed: index their reviews once
+            if conn.execute("SELECT 1 FROM reviews LIMIT 1").fetchone() and \
+                    not conn.execute("SELECT 1 FROM reviews_fts_docsize LIMIT 1").fetchone():
+                conn.execute("INSERT INTO reviews_fts (reviews_fts) VALUES ('rebuild')")
+
+    def sync_state(self, app_id, country, lang):
+        row = self._conn().execute(
+            "SELECT synced_at, newest_at, oldest_at, exhausted FROM review_sync WHERE app_id=? AND country=? AND lang=?",
+            (app_id, country, lang)).fetchone()
+        if row is None:
+            return None
+        return {'synced_at': row[0], 'newest_at': row[1], 'oldest_at': row[2], 'exhausted': bool(row[3])}
+
+    def add(self, app_id, country, lang, items):
+        """Upsert a page of reviews() results; returns how many were new."""
+        rows = [(app_id, country, lang, r['reviewId'], r.get('userName'), r.get('content'), r.get('score'),
+                 r.get('thumbsUpCount'), r.get('appVersion'), r['at'].timestamp(), r.get('replyContent'),
+                 r['repliedAt'].timestamp() if r.get('repliedAt') else None)
+                for r in items if r.get('reviewId') and r.get('at')]
+        with self._conn() as conn:
+            # rowcount, unlike total_changes, does not count the FTS trigger's writes
+            return conn.executemany("INSERT OR IGNORE INTO reviews VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                    rows).rowcount
+
+    def mark_synced(self, app_id, country, lang, newest_at, oldest_at, exhausted=False):
+        """Record the gap-free stored range [oldest_at, newest_at] and whether it reaches the feed's end."""
+        with self._conn() as conn:
+            conn.execute(
+                """INSERT INTO review_sync VALUES (?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (app_id, country, lang) DO UPDATE SET
+                       synced_at=excluded.synced_at, newest_at=excluded.newest_at,
+                       oldest_at=excluded.oldest_at, exhausted=excluded.exhausted""",
+                (app_id, country, lang, time.time(), newest_at, oldest_at, int(exhausted)))
+
+    def load(self, app_id, country, lang, since=None):
+        """Stored reviews, newest first, as a frame shaped like reviews() output."""
+        sql = ("SELECT review_id, user_name, content, score, thumbs_up, app_version, at, reply_content, replied_at "
+               "FROM reviews WHERE app_id=? AND country=? AND lang=?")
+        params = [app_id, country, lang]
+        if since is not None:
+            sql += " AND at>=?"
+            params.append(since.timestamp())
+        rows = self._conn().execute(sql + " ORDER BY at DESC", params).fetchall()
+        df = pd.DataFrame(rows, columns=self.COLUMNS)
+        for col in ('at', 'repliedAt'):
+            df[col] = df[col].map(lambda ts: datetime.fromtimestamp(ts) if pd.notna(ts) else None)
+        return df
+
+    def sentiment(self, review_ids, version):
+        """{reviewId: polarity} for the ids scored with sentiment `version` (see scout.sentiment)."""
+        review_ids = list(review_ids)
+        found = {}
+        conn = self._conn()
+        for start in range(0, len(review_ids), 900):
+            chunk = review_ids[start:start + 900]
+            found.update(conn.execute(
+                f"SELECT review_id, polarity FROM review_sentiment WHERE version=? AND review_id IN "
+                f"({','.join('?' * len(chunk))})", [version, *chunk]).fetchall())
+        return found
+
+    def put_sentiment(self, scores, version):
+        """Store (reviewId, polarity) pairs computed with sentiment `version`."""
+        with self._conn() as conn:
+            conn.executemany("INSERT OR REPLACE INTO review_sentiment VALUES (?, ?, ?)",
+                             ((review_id, version, polarity) for review_id, polarity in scores))
+
+    def iter_reviews(self, apps=None, chunk_rows=50000):
+        """Stored reviews of `apps` ((app_id, country, lang) tuples; default all) in typed chunks.
+
+        Always yields at least one (possibly empty) frame, with `at` and
+        `repliedAt` as UTC timestamps, for export.
+        """
+        sql = ("SELECT app_id, country, lang, review_id, user_name, content, score, thumbs_up, app_version, at, "
+               "reply_content, replied_at FROM reviews")
+        params = []
+        if apps:
+            sql += " WHERE " + " OR ".join(["(app_id=? AND country=? AND lang=?)"] * len(apps))
+            params = [v for app in apps for v in app]
+        columns = ['app_id', 'country', 'lang'] + self.COLUMNS
+        cur = self._conn().execute(sql + " ORDER BY app_id, country, lang, at DESC", params)
+        first = True
+        while True:
+            rows = cur.fetchmany(chunk_rows)
+            if not rows and not first:
+                return
+            first = False
+            df = pd.DataFrame(rows, columns=columns).astype({
+                'app_id': 'str', 'country': 'str', 'lang': 'str', 'reviewId': 'str', 'userName': 'str',
+                'content': 'str', 'score': 'Int8', 'thumbsUpCount': 'Int64', 'appVersion': 'str',
+                'replyContent': 'str'})
+            for col in ('at', 'repliedAt'):
+                df[col] = pd.to_datetime(pd.to_numeric(df[col]), unit='s', utc=True)
+            yield df
+            if len(rows) < chunk_rows:
+                return
+
+    def _search_where(self, query, apps, min_score, max_score, since, until):
+        match = fts_query(query)
+        if match is None:
+            return None
+        sql = ["reviews_fts MATCH ?"]
+        params = [match]
+        if apps:
+            sql.append("(" + " OR ".join(["(r.app_id=? AND r.country=? AND r.lang=?)"] * len(apps)) + ")")
+            params += [v for app in apps for v in app]
+        for cond, value in (("r.score>=?", min_score), ("r.score<=?", max_score),
+                            ("r.at>=?", since and since.timestamp()), ("r.at<?", until and until.timestamp())):
+            if value is not None:
+                sql.append(cond)
+                params.append(value)
+        return " AND ".join(sql), params
+
+    def search(self, query, apps=None, min_score=None, max_score=None, since=None, until=None, limit=500):
+        """Reviews matching `query` (terms and "phrases"), best match first.
+
+        `apps` limits the search to (app_id, country, lang) tuples; by default
+        every stored app is searched. Returns at most `limit` rows.
+        """
+        where = self._search_where(query, apps, min_score, max_score, since, until)
+        columns = ['app_id', 'country', 'lang'] + self.COLUMNS[:7]
+        if where is None:
+            return pd.DataFrame(columns=columns)
+        rows = self._conn().execute(
+            "SELECT r.app_id, r.country, r.lang, r.review_id, r.user_name, r.content, r.score, r.thumbs_up, "
+            "r.app_version, r.at FROM reviews_fts JOIN reviews r ON r.rowid = reviews_fts.rowid "
+            f"WHERE {where[0]} ORDER BY reviews_fts.rank LIMIT ?", where[1] + [limit]).fetchall()
+        df = pd.DataFrame(rows, columns=columns)
+        df['at'] = df['at'].map(datetime.fromtimestamp)
+        return df
+
+    def search_counts(self, query, apps=None, min_score=None, max_score=None, since=None, until=None):
+        """Matching reviews per app for `query`, most matches first."""
+        where = self._search_where(query, apps, min_score, max_score, since, until)
+        columns = ['app_id', 'country', 'lang', 'matches', 'avg_score']
+        if where is None:
+            return pd.DataFrame(columns=columns)
+        rows = self._conn().execute(
+            "SELECT r.app_id, r.country, r.lang, COUNT(*), ROUND(AVG(r.score), 2) "
+            "FROM reviews_fts JOIN reviews r ON r.rowid = reviews_fts.rowid "
+            f"WHERE {where[0]} GROUP BY r.app_id, r.country, r.lang ORDER BY COUNT(*) DESC", where[1]).fetchall()
+        return pd.DataFrame(rows, columns=columns)
+
+
+class Watchlist(SQLiteStore):
+    """Watched competitors and their snapshot history.
+
+    `watchlist` holds the apps to refresh, their interval, the review window
+    (in days) the worker keeps synced and the latest app() detail. `app_snapshots` holds one compact row of numbers per
+    refresh (rating, installs, review metrics), for any app that was
+    refreshed, so trends can be read without refetching.
+    """
+
+    SNAPSHOT_COLUMNS = ['taken_at', 'score', 'ratings', 'reviews', 'installs', 'version', 'updated',
+                        'reviews_30d', 'avg_score_30d', 'neg_share_30d']
+
+    SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS watchlist (
+            app_id TEXT NOT NULL,
+            country TEXT NOT NULL,
+            lang TEXT NOT NULL,
+            added_at REAL NOT NULL,
+            interval_s REAL NOT NULL,
+            window_days INTEGER NOT NULL DEFAULT 30,
+            last_run REAL,
+            last_ok REAL,
+            detail TEXT,
+            PRIMARY KEY (app_id, country, lang)
+        )""",
+        """CREATE TABLE IF NOT EXISTS app_snapshots (
+            app_id TEXT NOT NULL,
+            country TEXT NOT NULL,
+            lang TEXT NOT NULL,
+            taken_at REAL NOT NULL,
+            score REAL,
+            ratings INTEGER,
+            reviews INTEGER,
+            installs INTEGER,
+            version TEXT,
+            updated REAL,
+            reviews_30d INTEGER,
+            avg_score_30d REAL,
+            neg_share_30d REAL,
+            PRIMARY KEY (app_id, country, lang, taken_at)
+        )""",
+    )
+
+    def add(self, app_id, country, lang, interval_s=6 * 3600, window_days=30):
+        with self._conn() as conn:
+            conn.execute("""INSERT INTO watchlist (app_id, country, lang, added_at, interval_s, window_days)
+                            VALUES (?, ?, ?, ?, ?, ?)
+                            ON CONFLICT (app_id, country, lang) DO UPDATE SET
+                                interval_s=excluded.interval_s, window_days=excluded.window_days""",
+                         (app_id, country, lang, time.time(), interval_s, window_days))
+
+    def widen(self, app_id, country, lang, window_days):
+        """Keep at least `window_days` of reviews synced for a watched app."""
+        with self._conn() as conn:
+            conn.execute("UPDATE watchlist SET window_days=MAX(window_days, ?) WHERE app_id=? AND country=? AND lang=?",
+                         (window_days, app_id, country, lang))
+
+    def remove(self, app_id, country, lang):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM watchlist WHERE app_id=? AND country=? AND lang=?", (app_id, country, lang))
+
+    def state(self, app_id, country, lang):
+        """The watchlist entry of one app, or None if it is not watched."""
+        row = self._conn().execute(
+            "SELECT interval_s, window_days, last_run, last_ok, detail FROM watchlist "
+            "WHERE app_id=? AND country=? AND lang=?", (app_id, country, lang)).fetchone()
+        if row is None:
+            return None
+        return {'interval_s': row[0], 'window_days': row[1], 'last_run': row[2], 'last_ok': row[3],
+                'detail': json.loads(row[4]) if row[4] else None}
+
+    def entries(self):
+        rows = self._conn().execute(
+            "SELECT app_id, country, lang, interval_s, window_days, last_run, last_ok FROM watchlist "
+            "ORDER BY added_at").fetchall()
+        df = pd.DataFrame(rows, columns=['app_id', 'country', 'lang', 'interval_s', 'window_days', 'last_run',
+                                         'last_ok'])
+        for col in ('last_run', 'last_ok'):
+            df[col] = df[col].map(lambda ts: datetime.fromtimestamp(ts) if pd.notna(ts) else None)
+        return df
+
+    def claim_due(self, limit=50, retry_s=900):
+        """Mark due entries as running and return their keys.
+
+        An entry is due once its interval has passed, or `retry_s` after a
+        run that did not record a snapshot (failed or interrupted). The claim
+        is a conditional UPDATE, so several workers sharing the file never
+        refresh the same app twice in one interval.
+        """
+        now = time.time()
+        due = ("(last_run IS NULL OR last_run + interval_s <= :now "
+               "OR (COALESCE(last_ok, 0) < last_run AND last_run + MIN(interval_s, :retry) <= :now))")
+        rows = self._conn().execute(
+            f"SELECT app_id, country, lang FROM watchlist WHERE {due} ORDER BY COALESCE(last_run, 0) LIMIT :limit",
+            {'now': now, 'retry': retry_s, 'limit': limit}).fetchall()
+        claimed = []
+        with self._conn() as conn:
+            for app_id, country, lang in rows:
+                cur = conn.execute(f"UPDATE watchlist SET last_run=:now WHERE app_id=:app_id AND country=:country "
+                                   f"AND lang=:lang AND {due}",
+                                   {'now': now, 'retry': retry_s, 'app_id': app_id, 'country': country, 'lang': lang})
+                if cur.rowcount:
+                    claimed.append((app_id, country, lang))
+        return claimed
+
+    def record(self, app_id, country, lang, detail, snapshot):
+        """Store a snapshot (see scout.core.snapshot_metrics); refresh the watched detail."""
+        now = time.time()
+        row = (app_id, country, lang, now) + tuple(snapshot.get(col) for col in self.SNAPSHOT_COLUMNS[1:])
+        with self._conn() as conn:
+            conn.execute("INSERT OR REPLACE INTO app_snapshots VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", row)
+            conn.execute("UPDATE watchlist SET last_ok=?, detail=? WHERE app_id=? AND country=? AND lang=?",
+                         (now, json.dumps(detail, default=str), app_id, country, lang))
+
+    def history(self, app_id, country, lang, since=None):
+        """Snapshots of one app, oldest first."""
+        sql = ("SELECT taken_at, score, ratings, reviews, installs, version, updated, reviews_30d, avg_score_30d, "
+               "neg_share_30d FROM app_snapshots WHERE app_id=? AND country=? AND lang=?")
+        params = [app_id, country, lang]
+        if since is not None:
+            sql += " AND taken_at>=?"
+            params.append(since.timestamp())
+        rows = self._conn().execute(sql + " ORDER BY taken_at", params).fetchall()
+        df = pd.DataFrame(rows, columns=self.SNAPSHOT_COLUMNS)
+        df['taken_at'] = df['taken_at'].map(datetime.fromtimestamp)
+        return df
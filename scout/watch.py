@@ -0,0 +1,76 @@
+"""Background refresh of watched competitors.
+
+`WatchWorker` runs outside the request path: it claims the watchlist
+entries that are due, fetches their app() detail, syncs their reviews into
+the ReviewStore and records a snapshot. Competitor Spy then reads watched
+apps from local data only, for review windows up to the entry's
+`window_days`. Run it inside the app (started once per process)
+or standalone with ``python -m scout watch run``.
+"""
+import threading
+from datetime import datetime
+
+from scout.core import snapshot_metrics
+from scout.fetch import FetchEngine, fetch_competitor
+from scout.metrics import METRICS
+
+
+def refresh_app(watchlist, store, app_id, country, lang, engine, max_reviews=10000):
+    """Fetch, sync and snapshot one app; returns its detail or None on failure.
+
+    Reviews are synced over the entry's `window_days`.
+    """
+    entry = watchlist.state(app_id, country, lang)
+    if entry is None:
+        return None  # removed after it was claimed
+    result = fetch_competitor(store, app_id, country, lang, engine, window_days=entry['window_days'],
+                              max_reviews=max_reviews)
+    if result is None:
+        return None
+    detail, recent = result
+    watchlist.record(app_id, country, lang, detail, snapshot_metrics(detail, recent))
+    return detail
+
+
+class WatchWorker(threading.Thread):
+    """Daemon thread refreshing due watchlist entries every `poll_s` seconds.
+
+    Apps whose refresh failed are retried after `retry_s` instead of a full
+    interval. Errors of a whole cycle (e.g. a locked database) are counted
+    under 'watch' and the next cycle runs as usual.
+    """
+
+    def __init__(self, watchlist, store, poll_s=60, max_workers=4, rate_per_sec=2.0, retry_s=900):
+        super().__init__(name="scout-watch", daemon=True)
+        self.watchlist = watchlist
+        self.store = store
+        self.poll_s = poll_s
+        self.retry_s = retry_s
+        self.max_workers = max_workers
+        self.rate_per_sec = rate_per_sec
+        self.last_cycle = None
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.run_once()
+            except Exception as exc:
+                METRICS.error('watch', exc)
+            self._stop_event.wait(self.poll_s)
+
+    def run_once(self):
+        """Refresh everything that is due; returns (refreshed, failed) counts."""
+        due = self.watchlist.claim_due(retry_s=self.retry_s)
+        ok = 0
+        if due:
+            with METRICS.timed('watch.cycle'), \
+                    FetchEngine(max_workers=self.max_workers, rate_per_sec=self.rate_per_sec) as engine:
+                futs = [engine.run('watch', refresh_app, self.watchlist, self.store, *key, engine=engine)
+                        for key in due]
+                ok = sum(fut.result() is not None for fut in futs)
+        self.last_cycle = {'at': datetime.now(), 'refreshed': ok, 'failed': len(due) - ok}
+        return ok, len(due) - ok
+
+    def stop(self):
+        self._stop_event.set()
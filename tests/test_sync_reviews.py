@@ -0,0 +1,63 @@
+"""Regression tests for sync_reviews' stored range, against FakePlayStore."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from benchmarks.fakeplay import FakePlayStore, installed
+from scout.fetch import FetchEngine, sync_reviews
+from scout.store import ReviewStore
+
+APP = "com.fake.app.1"
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ReviewStore(str(tmp_path / "reviews.sqlite"))
+
+
+def in_window(fake, days):
+    since = datetime.now() - timedelta(days=days)
+    return sum(r['at'] >= since for r in fake.review_corpus(APP))
+
+
+def stored(store, days):
+    return len(store.load(APP, "id", "id", since=datetime.now() - timedelta(days=days)))
+
+
+def test_wider_window_backfills_older_history(store):
+    fake = FakePlayStore(reviews_per_app=2000)
+    with installed(fake):
+        sync_reviews(store, APP, "id", "id", window_days=1)
+        assert stored(store, 3) < in_window(fake, 3)
+        added = sync_reviews(store, APP, "id", "id", window_days=3)
+    assert added > 0
+    assert stored(store, 3) == in_window(fake, 3)
+
+
+def test_covered_window_stops_at_the_stored_range(store):
+    fake = FakePlayStore(reviews_per_app=2000)
+    with installed(fake):
+        sync_reviews(store, APP, "id", "id", window_days=3)
+        calls = fake.calls['reviews']
+        assert sync_reviews(store, APP, "id", "id", window_days=1) == 0
+    assert fake.calls['reviews'] - calls == 1
+
+
+def test_interrupted_sync_is_filled_in(store):
+    fake = FakePlayStore(reviews_per_app=2000)
+    reviews = fake.reviews
+
+    def failing(app_id, **kwargs):
+        if kwargs.get('continuation_token') is not None and fake.calls['reviews'] >= 2:
+            fake.calls['reviews'] += 1
+            raise ConnectionError("injected reviews failure")
+        return reviews(app_id, **kwargs)
+
+    engine = FetchEngine(rate_per_sec=0, max_retries=0)
+    with installed(fake):
+        sync_reviews(store, APP, "id", "id", window_days=3)
+        fake.reviews = failing
+        sync_reviews(store, APP, "id", "id", window_days=5, engine=engine)
+        fake.reviews = reviews
+        sync_reviews(store, APP, "id", "id", window_days=5)
+    assert stored(store, 5) == in_window(fake, 5)